@@ -6,18 +6,11 @@ from ui.dashboard import create_dashboard
 from ui.analytics import create_analytics
 from ui.config import create_config
 from ui.debug import create_debug
+from ui.lazy import lazy_tab
 from core.database import init_database
 
-def main():
-    """Initialize and launch the Gradio application."""
-    print("🚀 Starting AI Agent Observability Tool...")
-    
-    # Initialize database
-    print("📊 Initializing database...")
-    init_database()
-    print("✅ Database ready!")
-    
-    print("🎨 Creating user interface...")
+def create_app() -> gr.Blocks:
+    """Build the application's interface without launching it."""
     with gr.Blocks(title="AI Agent Observability Tool", theme=gr.themes.Soft()) as demo:
         gr.Markdown("# AI Agent Observability Tool")
         gr.Markdown("Monitor, debug, and analyze AI agent interactions locally")
@@ -26,14 +19,28 @@ def main():
             with gr.Tab("Live Dashboard"):
                 create_dashboard()
             
-            with gr.Tab("Analytics"):
-                create_analytics()
+            lazy_tab("Analytics", create_analytics)
             
-            with gr.Tab("Configuration"):
-                create_config()
+            lazy_tab("Configuration", create_config)
             
-            with gr.Tab("Debug Console"):
-                create_debug()
+            lazy_tab("Debug Console", create_debug)
+    
+    # Queue requests so concurrent viewers share workers instead of timing out;
+    # cheap read handlers raise their own limit above the default.
+    demo.queue(default_concurrency_limit=4, max_size=64)
+    return demo
+
+def main():
+    """Initialize and launch the Gradio application."""
+    print("🚀 Starting AI Agent Observability Tool...")
+    
+    # Initialize database
+    print("📊 Initializing database...")
+    init_database()
+    print("✅ Database ready!")
+    
+    print("🎨 Creating user interface...")
+    demo = create_app()
     
     print("✅ Interface ready!")
     print("🌐 Launching application...")
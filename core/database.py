@@ -1,12 +1,22 @@
 """
 SQLite database operations for the AI Agent Observability Tool.
 """
+import os
 import sqlite3
-import json
-from datetime import datetime
+import queue
+import atexit
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 from contextlib import contextmanager
+from dataclasses import dataclass
+
+import orjson
+import zstandard
 
 from .models import (
     AgentSession, 
@@ -17,14 +27,233 @@ from .models import (
     AgentConfiguration
 )
 
+logger = logging.getLogger(__name__)
+
+
+# JSON columns (and stack traces) are stored as a BLOB with a one-byte prefix:
+# _RAW for payloads too small to be worth compressing, _ZSTD otherwise. Values
+# written before compression was introduced are plain TEXT and still decode.
+_RAW = b"\x00"
+_ZSTD = b"\x01"
+COMPRESS_MIN_BYTES = 256
+COMPRESSION_LEVEL = 3
+
+
+def _compress(data: bytes) -> bytes:
+    if len(data) < COMPRESS_MIN_BYTES:
+        return _RAW + data
+    return _ZSTD + zstandard.compress(data, COMPRESSION_LEVEL)
+
+
+def _decompress(blob: bytes) -> bytes:
+    if blob[:1] == _ZSTD:
+        return zstandard.decompress(blob[1:])
+    return blob[1:]
+
+
+class EncodedJSON(dict):
+    """
+    A read-only dict that carries its own JSON encoding, for constant column
+    values written many times. The encoding is taken when it is created, and
+    any attempt to modify the dict raises TypeError, so the two cannot drift
+    apart and one instance can be shared safely.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encoded = orjson.dumps(self, option=orjson.OPT_NON_STR_KEYS)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # copy and pickle would otherwise refill the dict item by item
+        return type(self), (dict(self),)
+
+
+def _pack(obj: Any) -> Optional[bytes]:
+    """
+    Serialize a JSON column value.
+
+    Empty values are stored as NULL; readers map NULL back to an empty dict.
+    """
+    if not obj:
+        return None
+    if isinstance(obj, EncodedJSON):
+        return _compress(obj.encoded)
+    return _compress(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
+
+def _unpack(value: Union[bytes, str]) -> Any:
+    """Deserialize a JSON column value written by _pack() or as legacy TEXT."""
+    if isinstance(value, str):
+        return orjson.loads(value)
+    return orjson.loads(_decompress(value))
+
+
+def _pack_text(text: Optional[str]) -> Optional[bytes]:
+    """Store a free-text column (e.g. a stack trace) the same way as _pack()."""
+    if text is None:
+        return None
+    return _compress(text.encode())
+
+
+def _unpack_text(value: Union[bytes, str, None]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return _decompress(value).decode()
+
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(dt: Optional[datetime]) -> Optional[int]:
+    """
+    Convert a datetime to integer microseconds since the Unix epoch.
+
+    Timestamps are stored in this form. Naive datetimes are taken as UTC, which
+    is what the models produce by default.
+    """
+    if dt is None:
+        return None
+    return (dt - (_EPOCH if dt.tzinfo is None else _EPOCH_UTC)) // _MICROSECOND
+
+
+def from_epoch_us(us: Optional[int]) -> Optional[datetime]:
+    """Convert stored epoch microseconds back to a naive UTC datetime."""
+    if us is None:
+        return None
+    return _EPOCH + timedelta(microseconds=us)
+
 DATABASE_PATH = Path("data/observability.db")
 
+# Per-connection tuning. WAL lets dashboard reads run alongside ingestion
+# writes; the rest trade a little durability/memory for throughput.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    # Keep the WAL from growing without bound under sustained writes
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA journal_size_limit=67108864",
+)
+
+# Seconds between background PRAGMA optimize runs
+OPTIMIZE_INTERVAL = 15 * 60
+
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Total pooled connections: one dedicated writer, the rest shared by readers
+POOL_SIZE = min(8, os.cpu_count() or 1) + 1
+
+# Bumped whenever init_database() needs to rewrite existing data
+SCHEMA_VERSION = 2
+
+# Timestamp columns, stored as INTEGER epoch microseconds since version 1
+_TIMESTAMP_COLUMNS = {
+    "agent_sessions": ("start_time", "end_time"),
+    "conversations": ("start_time", "end_time"),
+    "messages": ("timestamp",),
+    "performance_metrics": ("timestamp",),
+    "system_events": ("timestamp",),
+    "agent_configurations": ("created_at", "updated_at"),
+}
+
+# Statements are kept as module constants so every call passes the identical
+# string and hits the connection's prepared-statement cache. Statements on
+# sharded tables take the shard name via str.format().
+_SQL_INSERT_SESSION = """
+    INSERT INTO agent_sessions 
+    (id, agent_name, status, start_time, end_time, configuration, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# List/summary reads name their columns and leave out the JSON blobs; the
+# *_FULL statements back the detail accessors that need everything.
+_SESSION_COLUMNS = "id, agent_name, status, start_time, end_time"
+
+_SQL_UPDATE_SESSION = "UPDATE agent_sessions SET status = ?2, end_time = ?3 WHERE id = ?1"
+
+_SQL_SELECT_SESSION_FULL = "SELECT * FROM agent_sessions WHERE id = ?"
+
+_SQL_SELECT_ACTIVE_SESSIONS = (
+    f"SELECT {_SESSION_COLUMNS} FROM agent_sessions WHERE status = 'active'"
+)
+
+_SQL_COUNT_ACTIVE_SESSIONS = "SELECT COUNT(*) FROM agent_sessions WHERE status = 'active'"
+
+_SQL_SESSION_STATUS_COUNTS = """
+    SELECT status, COUNT(*) as count 
+    FROM agent_sessions 
+    GROUP BY status
+"""
+
+_SQL_INSERT_CONVERSATION = """
+    INSERT INTO conversations 
+    (id, session_id, start_time, end_time, context, token_usage)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_MESSAGE = """
+    INSERT INTO {shard} 
+    (id, conversation_id, role, content, timestamp, metadata, tool_calls)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_METRICS = """
+    INSERT INTO performance_metrics 
+    (id, session_id, conversation_id, response_time_ms, token_count_input,
+     token_count_output, success_rate, error_count, timestamp,
+     resource_usage, quality_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_METRICS_SUMMARY = """
+    SELECT 
+        COUNT(*) as total_requests,
+        AVG(response_time_ms) as avg_response_time,
+        AVG(success_rate) as avg_success_rate,
+        SUM(token_count_input) as total_input_tokens,
+        SUM(token_count_output) as total_output_tokens,
+        AVG(quality_score) as avg_quality_score
+    FROM performance_metrics
+"""
+
+_SQL_METRICS_SUMMARY_FOR_SESSION = _SQL_METRICS_SUMMARY + "WHERE session_id = ?"
+
+_SQL_INSERT_EVENT = """
+    INSERT INTO {shard} 
+    (id, event_type, session_id, conversation_id, message, details,
+     timestamp, stack_trace)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_EVENT_COLUMNS = "id, event_type, session_id, conversation_id, message, timestamp"
+
+# {where} is empty or a "WHERE ..." clause built by _select_recent_events()
+_SQL_SELECT_RECENT_EVENTS = f"""
+    SELECT {_EVENT_COLUMNS} FROM {{shard}} {{where}}
+    ORDER BY timestamp DESC 
+    LIMIT ?
+"""
+
+_SQL_SELECT_EVENT_FULL = "SELECT * FROM {shard} WHERE id = ?"
+
 
 def init_database():
     """Initialize the SQLite database with required tables."""
     DATABASE_PATH.parent.mkdir(exist_ok=True)
     
-    with get_connection() as conn:
+    with get_connection(write=True) as conn:
         cursor = conn.cursor()
         
         # Agent sessions table
@@ -33,10 +262,10 @@ def init_database():
                 id TEXT PRIMARY KEY,
                 agent_name TEXT NOT NULL,
                 status TEXT NOT NULL,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                configuration TEXT,
-                metadata TEXT
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
+                configuration BLOB,
+                metadata BLOB
             )
         """)
         
@@ -45,28 +274,14 @@ def init_database():
             CREATE TABLE IF NOT EXISTS conversations (
                 id TEXT PRIMARY KEY,
                 session_id TEXT NOT NULL,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                context TEXT,
-                token_usage TEXT,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
+                context BLOB,
+                token_usage BLOB,
                 FOREIGN KEY (session_id) REFERENCES agent_sessions (id)
             )
         """)
         
-        # Messages table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS messages (
-                id TEXT PRIMARY KEY,
-                conversation_id TEXT NOT NULL,
-                role TEXT NOT NULL,
-                content TEXT NOT NULL,
-                timestamp TIMESTAMP NOT NULL,
-                metadata TEXT,
-                tool_calls TEXT,
-                FOREIGN KEY (conversation_id) REFERENCES conversations (id)
-            )
-        """)
-        
         # Performance metrics table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS performance_metrics (
@@ -78,30 +293,14 @@ def init_database():
                 token_count_output INTEGER DEFAULT 0,
                 success_rate REAL DEFAULT 1.0,
                 error_count INTEGER DEFAULT 0,
-                timestamp TIMESTAMP NOT NULL,
-                resource_usage TEXT,
+                timestamp INTEGER NOT NULL,
+                resource_usage BLOB,
                 quality_score REAL,
                 FOREIGN KEY (session_id) REFERENCES agent_sessions (id),
                 FOREIGN KEY (conversation_id) REFERENCES conversations (id)
             )
         """)
         
-        # System events table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_events (
-                id TEXT PRIMARY KEY,
-                event_type TEXT NOT NULL,
-                session_id TEXT,
-                conversation_id TEXT,
-                message TEXT NOT NULL,
-                details TEXT,
-                timestamp TIMESTAMP NOT NULL,
-                stack_trace TEXT,
-                FOREIGN KEY (session_id) REFERENCES agent_sessions (id),
-                FOREIGN KEY (conversation_id) REFERENCES conversations (id)
-            )
-        """)
-        
         # Agent configurations table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS agent_configurations (
@@ -111,8 +310,8 @@ def init_database():
                 system_prompt TEXT,
                 tools TEXT,
                 environment_variables TEXT,
-                created_at TIMESTAMP NOT NULL,
-                updated_at TIMESTAMP NOT NULL,
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL,
                 is_active BOOLEAN DEFAULT TRUE
             )
         """)
@@ -121,225 +320,854 @@ def init_database():
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_agent ON agent_sessions(agent_name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_status ON agent_sessions(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations(session_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_session ON performance_metrics(session_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_session ON system_events(session_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_type ON system_events(event_type)")
+        
+        # Covering index: metrics summaries are answered from the index alone.
+        # Its session_id prefix also serves plain lookups, superseding the old
+        # single-column index.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_metrics_session_cover ON performance_metrics(
+                session_id, response_time_ms, success_rate,
+                token_count_input, token_count_output, quality_score
+            )
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_metrics_session")
+        
+        _migrate(conn)
+        
+        # Messages and system events live in monthly shards behind a view
+        now_us = to_epoch_us(datetime.utcnow())
+        for table in _SHARDED_TABLES:
+            _create_shard(conn, table, _shard_name(table, now_us))
+            _rebuild_shard_view(conn, table)
         
         conn.commit()
 
 
+def _migrate(conn: sqlite3.Connection):
+    """Bring data written by older versions up to SCHEMA_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        # ISO-8601 text timestamps -> epoch microseconds
+        for table, columns in _TIMESTAMP_COLUMNS.items():
+            if not _table_exists(conn, table):
+                continue
+            for column in columns:
+                rows = conn.execute(
+                    f"SELECT rowid, {column} FROM {table} WHERE typeof({column}) = 'text'"
+                ).fetchall()
+                conn.executemany(
+                    f"UPDATE {table} SET {column} = ? WHERE rowid = ?",
+                    [(to_epoch_us(datetime.fromisoformat(value)), rowid)
+                     for rowid, value in rows]
+                )
+    if version < 2:
+        # Split the single messages/system_events tables into monthly shards
+        month = "strftime('%Y%m', timestamp / 1000000, 'unixepoch')"
+        for table in _SHARDED_TABLES:
+            if not _table_exists(conn, table):
+                continue
+            months = conn.execute(f"SELECT DISTINCT {month} FROM {table}").fetchall()
+            for (yyyymm,) in months:
+                shard = f"{table}_{yyyymm}"
+                _create_shard(conn, table, shard)
+                conn.execute(
+                    f"INSERT INTO {shard} SELECT * FROM {table} WHERE {month} = ?",
+                    (yyyymm,)
+                )
+            conn.execute(f"DROP TABLE {table}")
+    if version < SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+# Time-partitioned tables: each month's rows go to "<table>_YYYYMM", so only
+# the current shard's B-trees are hot for inserts. "<table>" itself is a
+# UNION ALL view over every shard.
+_SHARDED_TABLES = {
+    "messages": {
+        "columns": """
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            metadata BLOB,
+            tool_calls BLOB,
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id)
+        """,
+        "indexes": {"conversation": "conversation_id"},
+    },
+    "system_events": {
+        "columns": """
+            id TEXT PRIMARY KEY,
+            event_type TEXT NOT NULL,
+            session_id TEXT,
+            conversation_id TEXT,
+            message TEXT NOT NULL,
+            details BLOB,
+            timestamp INTEGER NOT NULL,
+            stack_trace BLOB,
+            FOREIGN KEY (session_id) REFERENCES agent_sessions (id),
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id)
+        """,
+        "indexes": {
+            "session": "session_id",
+            "type": "event_type",
+            "ts": "timestamp DESC",
+        },
+    },
+}
+
+
+def _shard_name(table: str, timestamp_us: int) -> str:
+    """Name of the monthly shard of ``table`` holding ``timestamp_us``."""
+    return f"{table}_{from_epoch_us(timestamp_us):%Y%m}"
+
+
+def _shard_start_us(shard: str) -> int:
+    """First timestamp (epoch microseconds) that belongs in ``shard``."""
+    yyyymm = shard[-6:]
+    return to_epoch_us(datetime(int(yyyymm[:4]), int(yyyymm[4:]), 1))
+
+
+def _list_shards(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Shards of ``table``, newest first."""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? "
+        "ORDER BY name DESC",
+        (f"{table}_[0-9][0-9][0-9][0-9][0-9][0-9]",)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _create_shard(conn: sqlite3.Connection, table: str, shard: str):
+    spec = _SHARDED_TABLES[table]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {shard} ({spec['columns']})")
+    for suffix, columns in spec["indexes"].items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{shard}_{suffix} ON {shard}({columns})")
+
+
+def _rebuild_shard_view(conn: sqlite3.Connection, table: str):
+    union = " UNION ALL ".join(f"SELECT * FROM {shard}" for shard in _list_shards(conn, table))
+    conn.execute(f"DROP VIEW IF EXISTS {table}")
+    conn.execute(f"CREATE VIEW {table} AS {union}")
+
+
+def _ensure_shard(conn: sqlite3.Connection, table: str, shard: str):
+    """Create ``shard`` (and add it to the view) if this is its first row."""
+    if not _table_exists(conn, shard):
+        _create_shard(conn, table, shard)
+        _rebuild_shard_view(conn, table)
+
+
+def _configure_connection(conn: sqlite3.Connection):
+    """Apply the standard PRAGMAs to a freshly opened connection."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+class _PooledConnection(sqlite3.Connection):
+    """
+    Connection that remembers its cursors so the pool can close them.
+
+    An unfinished SELECT keeps its read snapshot (and blocks WAL checkpoints)
+    until its statement is reset, which closing the cursor does. Connections
+    are never closed between borrowers, so the pool resets them on return.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors: "weakref.WeakSet[sqlite3.Cursor]" = weakref.WeakSet()
+
+    def cursor(self, factory=sqlite3.Cursor):
+        cursor = super().cursor(factory)
+        self._cursors.add(cursor)
+        return cursor
+
+    # The C implementations of these bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self.cursor().executemany(sql, parameters)
+
+    def close_cursors(self):
+        """Close every cursor handed out so far, resetting their statements."""
+        for cursor in list(self._cursors):
+            cursor.close()
+        self._cursors.clear()
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of open SQLite connections.
+
+    A single write connection is serialized behind a lock (SQLite only allows
+    one writer at a time anyway); the remaining connections are handed out to
+    readers from a queue and returned, never closed, after each use. Cursors
+    opened on a borrowed connection are closed when it is returned, so rows
+    must be fetched inside the ``with`` block.
+    """
+
+    def __init__(self, path: Path, size: int = POOL_SIZE):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
+        self._readers: queue.Queue = queue.Queue()
+        for _ in range(max(size - 1, 1)):
+            self._readers.put(self._connect())
+        # PRAGMA data_version is per connection and only moves for commits made
+        # by other connections, so it is read from one that never writes
+        self._version_lock = threading.Lock()
+        self._version_conn = self._connect()
+        self._closed = threading.Event()
+        threading.Thread(
+            target=self._optimize_periodically, name="db-optimizer", daemon=True
+        ).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE,
+            factory=_PooledConnection
+        )
+        conn.row_factory = sqlite3.Row
+        _configure_connection(conn)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read connection for the duration of the block."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            conn.close_cursors()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Hold the write connection exclusively for the duration of the block."""
+        with self._write_lock:
+            try:
+                yield self._write_conn
+            except BaseException:
+                self._write_conn.rollback()
+                raise
+            finally:
+                self._write_conn.close_cursors()
+
+    def data_version(self) -> int:
+        """Counter that changes whenever another connection commits a write."""
+        with self._version_lock:
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _optimize_periodically(self):
+        """Refresh planner statistics on a dedicated connection until closed."""
+        conn = sqlite3.connect(self.path)
+        _configure_connection(conn)
+        try:
+            while not self._closed.wait(OPTIMIZE_INTERVAL):
+                conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+
+    def close(self):
+        """Close every pooled connection, folding the WAL back into the database."""
+        self._closed.set()
+        with self._write_lock:
+            self._write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conns = [self._write_conn]
+            while not self._readers.empty():
+                conns.append(self._readers.get_nowait())
+            for conn in conns:
+                # Let SQLite refresh planner statistics for tables touched this session
+                conn.execute("PRAGMA optimize")
+                conn.close()
+        with self._version_lock:
+            self._version_conn.close()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool, (re)opening it for DATABASE_PATH."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DATABASE_PATH:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DATABASE_PATH)
+        return _pool
+
+
+def close_pool():
+    """Close the shared connection pool if it has been opened."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+# Pools inherited across fork(); kept referenced so their connections are
+# never closed (or used) by the child.
+_forked_pools: List[ConnectionPool] = []
+
+
+def _forget_pool_after_fork():
+    """Start the child with no pool; SQLite connections must not cross a fork."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        _forked_pools.append(_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
 @contextmanager
-def get_connection():
-    """Get database connection with proper context management."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
+def get_connection(write: bool = False):
+    """Get a pooled database connection with proper context management."""
+    pool = get_pool()
+    with (pool.writer() if write else pool.reader()) as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+class BatchWriter:
+    """
+    Background group-commit writer for high-rate ingestion.
+
+    Rows submitted from any thread are queued and written by a daemon thread,
+    one transaction per batch of up to ``max_batch_size`` rows or
+    ``max_batch_delay`` seconds of arrivals, whichever comes first. Once
+    ``max_queue_size`` rows are waiting, submit() blocks until the writer
+    catches up.
+    """
+
+    def __init__(self, manager: "DatabaseManager",
+                 max_batch_size: int = 500,
+                 max_batch_delay: float = 0.05,
+                 max_queue_size: int = 10_000):
+        self.manager = manager
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        # Only the forking thread survives, so the writer thread is gone; rows
+        # the parent had queued are its to commit, not the child's
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, kind: str, item: Any):
+        """
+        Queue a row for writing.
+
+        Args:
+            kind: One of "session", "conversation", "message" (item is a
+                (Message, conversation_id) pair), "metrics", "event" or
+                "session_update" (status and end time of an existing session)
+            item: The model to insert
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put((kind, item))
+
+    def flush(self):
+        """Block until every row submitted so far has been committed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="db-batch-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[Tuple[str, Any]]):
+        by_kind: Dict[str, List[Any]] = {}
+        for kind, item in batch:
+            by_kind.setdefault(kind, []).append(item)
+        try:
+            self.manager.bulk_insert(by_kind)
+        except Exception:
+            logger.exception("Batch insert of %d rows failed; retrying row by row", len(batch))
+            # Isolate the bad rows instead of dropping the whole batch
+            for kind, item in batch:
+                try:
+                    self.manager.bulk_insert({kind: [item]})
+                except Exception:
+                    logger.exception("Dropped %s row", kind)
 
 
 class DatabaseManager:
     """Database manager for handling CRUD operations."""
     
+    def __init__(self):
+        self.writer = BatchWriter(self)
+    
+    def flush(self):
+        """Wait for rows queued on the background writer to be committed."""
+        self.writer.flush()
+    
+    def bulk_insert(self, rows_by_kind: Dict[str, List[Any]]) -> Dict[str, List[str]]:
+        """
+        Insert rows of several kinds in one transaction.
+
+        Args:
+            rows_by_kind: Models keyed by "session", "conversation",
+                "message" (as (Message, conversation_id) pairs), "metrics",
+                "event" or "session_update"
+
+        Returns:
+            The inserted ids, keyed the same way
+
+        Ids are generated by the models, so they're taken from the rows
+        themselves rather than read back from SQLite. If id generation ever
+        moves into the database, switch these statements to
+        ``INSERT ... RETURNING id`` and collect the ids from the cursor
+        instead of using executemany().
+        """
+        # Kinds are applied in _BULK_INSERTS order, so e.g. a session is
+        # inserted before any update to it that arrived in the same batch
+        statements = [
+            (kind, sql, [build(item) for item in rows_by_kind[kind]])
+            for kind, (sql, build) in _BULK_INSERTS.items()
+            if kind in rows_by_kind
+        ]
+        with get_connection(write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for kind, sql, rows in statements:
+                if not rows:
+                    continue
+                if kind not in _SHARDED_KINDS:
+                    conn.executemany(sql, rows)
+                    continue
+                table, ts_index = _SHARDED_KINDS[kind]
+                by_shard: Dict[str, List[tuple]] = {}
+                for row in rows:
+                    by_shard.setdefault(_shard_name(table, row[ts_index]), []).append(row)
+                for shard, shard_rows in by_shard.items():
+                    _ensure_shard(conn, table, shard)
+                    conn.executemany(sql.format(shard=shard), shard_rows)
+            conn.commit()
+        return {kind: [row[0] for row in rows] for kind, _, rows in statements}
+    
     # Agent Sessions
     def create_session(self, session: AgentSession) -> str:
         """Create a new agent session."""
-        with get_connection() as conn:
+        with get_connection(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO agent_sessions 
-                (id, agent_name, status, start_time, end_time, configuration, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session.id,
-                session.agent_name,
-                session.status.value if hasattr(session.status, 'value') else session.status,
-                session.start_time,
-                session.end_time,
-                json.dumps(session.configuration),
-                json.dumps(session.metadata)
-            ))
+            cursor.execute(_SQL_INSERT_SESSION, _session_row(session))
             conn.commit()
             return session.id
     
+    def add_session(self, session: AgentSession) -> str:
+        """Queue a new agent session for the background writer (see flush())."""
+        self.writer.submit("session", session)
+        return session.id
+    
+    def create_sessions_bulk(self, sessions: List[AgentSession]) -> List[str]:
+        """Create several agent sessions in a single transaction."""
+        return self.bulk_insert({"session": sessions})["session"]
+    
+    def update_session(self, session: AgentSession) -> str:
+        """Queue a session's status and end time for writing (see flush())."""
+        self.writer.submit("session_update", session)
+        return session.id
+    
     def get_session(self, session_id: str) -> Optional[AgentSession]:
-        """Get session by ID."""
+        """Get session by ID, including its configuration and metadata."""
         with get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM agent_sessions WHERE id = ?", (session_id,))
+            cursor.execute(_SQL_SELECT_SESSION_FULL, (session_id,))
             row = cursor.fetchone()
-            
-            if row:
-                return AgentSession(
-                    id=row['id'],
-                    agent_name=row['agent_name'],
-                    status=row['status'],
-                    start_time=datetime.fromisoformat(row['start_time']),
-                    end_time=datetime.fromisoformat(row['end_time']) if row['end_time'] else None,
-                    configuration=json.loads(row['configuration']) if row['configuration'] else {},
-                    metadata=json.loads(row['metadata']) if row['metadata'] else {}
-                )
-            return None
+            return _session_from_row(row, full=True) if row else None
     
     def get_active_sessions(self) -> List[AgentSession]:
-        """Get all active sessions."""
+        """
+        Get all active sessions.
+
+        Only identity, status and timing are loaded; configuration and metadata
+        are left empty. Use get_session() for one session's full record.
+        """
+        return [_session_from_row(row) for row in self.get_active_sessions_raw()]
+    
+    def get_active_sessions_raw(self) -> List[sqlite3.Row]:
+        """
+        Get all active sessions as raw rows.
+
+        Cheaper than get_active_sessions() for read-only display: timestamps
+        stay in epoch microseconds. Rows carry the columns of get_active_sessions().
+        """
         with get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM agent_sessions WHERE status = 'active'")
-            rows = cursor.fetchall()
-            
-            sessions = []
-            for row in rows:
-                sessions.append(AgentSession(
-                    id=row['id'],
-                    agent_name=row['agent_name'],
-                    status=row['status'],
-                    start_time=datetime.fromisoformat(row['start_time']),
-                    end_time=datetime.fromisoformat(row['end_time']) if row['end_time'] else None,
-                    configuration=json.loads(row['configuration']) if row['configuration'] else {},
-                    metadata=json.loads(row['metadata']) if row['metadata'] else {}
-                ))
-            return sessions
+            cursor.execute(_SQL_SELECT_ACTIVE_SESSIONS)
+            return cursor.fetchall()
+    
+    def count_active_sessions(self) -> int:
+        """Count active sessions without fetching them."""
+        with get_connection() as conn:
+            return conn.execute(_SQL_COUNT_ACTIVE_SESSIONS).fetchone()[0]
     
     # Conversations
     def create_conversation(self, conversation: Conversation) -> str:
         """Create a new conversation."""
-        with get_connection() as conn:
+        with get_connection(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO conversations 
-                (id, session_id, start_time, end_time, context, token_usage)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                conversation.id,
-                conversation.session_id,
-                conversation.start_time,
-                conversation.end_time,
-                json.dumps(conversation.context),
-                json.dumps(conversation.token_usage)
-            ))
+            cursor.execute(_SQL_INSERT_CONVERSATION, _conversation_row(conversation))
             conn.commit()
             return conversation.id
     
+    def create_conversations_bulk(self, conversations: List[Conversation]) -> List[str]:
+        """Create several conversations in a single transaction."""
+        return self.bulk_insert({"conversation": conversations})["conversation"]
+    
+    def add_conversation(self, conversation: Conversation) -> str:
+        """Queue a conversation for the background writer (see flush())."""
+        self.writer.submit("conversation", conversation)
+        return conversation.id
+    
     def add_message(self, message: Message, conversation_id: str) -> str:
-        """Add a message to a conversation."""
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO messages 
-                (id, conversation_id, role, content, timestamp, metadata, tool_calls)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                message.id,
-                conversation_id,
-                message.role.value if hasattr(message.role, 'value') else message.role,
-                message.content,
-                message.timestamp,
-                json.dumps(message.metadata),
-                json.dumps(message.tool_calls) if message.tool_calls else None
-            ))
-            conn.commit()
-            return message.id
+        """Queue a message for the background writer (see flush())."""
+        self.writer.submit("message", (message, conversation_id))
+        return message.id
+    
+    def add_messages_bulk(self, messages: List[Tuple[Message, str]]) -> List[str]:
+        """Add (message, conversation_id) pairs in a single transaction."""
+        return self.bulk_insert({"message": messages})["message"]
     
     # Performance Metrics
     def add_metrics(self, metrics: PerformanceMetrics) -> str:
-        """Add performance metrics."""
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO performance_metrics 
-                (id, session_id, conversation_id, response_time_ms, token_count_input,
-                 token_count_output, success_rate, error_count, timestamp,
-                 resource_usage, quality_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                metrics.id,
-                metrics.session_id,
-                metrics.conversation_id,
-                metrics.response_time_ms,
-                metrics.token_count_input,
-                metrics.token_count_output,
-                metrics.success_rate,
-                metrics.error_count,
-                metrics.timestamp,
-                json.dumps(metrics.resource_usage),
-                metrics.quality_score
-            ))
-            conn.commit()
-            return metrics.id
+        """Queue performance metrics for the background writer (see flush())."""
+        self.writer.submit("metrics", metrics)
+        return metrics.id
+    
+    def add_metrics_bulk(self, metrics_list: List[PerformanceMetrics]) -> List[str]:
+        """Add several performance metrics rows in a single transaction."""
+        return self.bulk_insert({"metrics": metrics_list})["metrics"]
     
     def get_metrics_summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """Get performance metrics summary."""
         with get_connection() as conn:
             cursor = conn.cursor()
             
-            where_clause = "WHERE session_id = ?" if session_id else ""
-            params = (session_id,) if session_id else ()
-            
-            cursor.execute(f"""
-                SELECT 
-                    COUNT(*) as total_requests,
-                    AVG(response_time_ms) as avg_response_time,
-                    AVG(success_rate) as avg_success_rate,
-                    SUM(token_count_input) as total_input_tokens,
-                    SUM(token_count_output) as total_output_tokens,
-                    AVG(quality_score) as avg_quality_score
-                FROM performance_metrics
-                {where_clause}
-            """, params)
+            if session_id:
+                cursor.execute(_SQL_METRICS_SUMMARY_FOR_SESSION, (session_id,))
+            else:
+                cursor.execute(_SQL_METRICS_SUMMARY)
             
             row = cursor.fetchone()
             return dict(row) if row else {}
     
     # System Events
     def add_event(self, event: SystemEvent) -> str:
-        """Add a system event."""
+        """Queue a system event for the background writer (see flush())."""
+        self.writer.submit("event", event)
+        return event.id
+    
+    def add_events_bulk(self, events: List[SystemEvent]) -> List[str]:
+        """Add several system events in a single transaction."""
+        return self.bulk_insert({"event": events})["event"]
+    
+    def get_event(self, event_id: str) -> Optional[SystemEvent]:
+        """Get a single system event by ID, including details and stack trace."""
         with get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO system_events 
-                (id, event_type, session_id, conversation_id, message, details,
-                 timestamp, stack_trace)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event.id,
-                event.event_type.value if hasattr(event.event_type, 'value') else event.event_type,
-                event.session_id,
-                event.conversation_id,
-                event.message,
-                json.dumps(event.details),
-                event.timestamp,
-                event.stack_trace
-            ))
-            conn.commit()
-            return event.id
+            for shard in _list_shards(conn, "system_events"):
+                cursor.execute(_SQL_SELECT_EVENT_FULL.format(shard=shard), (event_id,))
+                row = cursor.fetchone()
+                if row:
+                    return _event_from_row(row, full=True)
+            return None
+    
+    def get_recent_events(self, limit: int = 100,
+                          after_ts: Optional[int] = None,
+                          level: Optional[str] = None,
+                          since_ts: Optional[int] = None) -> List[SystemEvent]:
+        """
+        Get recent system events, newest first.
+
+        Details and stack traces are not loaded for the list; fetch them per
+        event with get_event().
+
+        Args:
+            limit: Maximum number of events to return
+            after_ts: Keyset cursor in epoch microseconds, normally the timestamp
+                of the last event on the previous page; only events older than
+                it are returned
+            level: Only return events of this type (case-insensitive); None
+                or "ALL" returns every type
+            since_ts: Only return events newer than this, in epoch
+                microseconds; used to poll for events since the last seen one
+        """
+        rows = self.get_recent_events_raw(limit, after_ts, level, since_ts)
+        return [_event_from_row(row) for row in rows]
+    
+    def get_recent_events_raw(self, limit: int = 100,
+                              after_ts: Optional[int] = None,
+                              level: Optional[str] = None,
+                              since_ts: Optional[int] = None) -> List[sqlite3.Row]:
+        """Get recent system events as raw rows (see get_active_sessions_raw)."""
+        with get_connection() as conn:
+            return _select_recent_events(conn.cursor(), limit, after_ts, level, since_ts)
     
-    def get_recent_events(self, limit: int = 100) -> List[SystemEvent]:
-        """Get recent system events."""
+    def get_session_status_counts(self) -> Dict[str, int]:
+        """Get the number of sessions in each status."""
         with get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM system_events 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            events = []
-            for row in cursor.fetchall():
-                events.append(SystemEvent(
-                    id=row['id'],
-                    event_type=row['event_type'],
-                    session_id=row['session_id'],
-                    conversation_id=row['conversation_id'],
-                    message=row['message'],
-                    details=json.loads(row['details']) if row['details'] else {},
-                    timestamp=datetime.fromisoformat(row['timestamp']),
-                    stack_trace=row['stack_trace']
-                ))
-            return events
+            cursor.execute(_SQL_SESSION_STATUS_COUNTS)
+            return {row['status']: row['count'] for row in cursor.fetchall()}
+    
+    # Dashboard
+    def get_data_version(self) -> Tuple[int, int]:
+        """
+        Get a cheap token that changes whenever committed data may have changed.
+
+        Equal tokens from two calls mean nothing was written in between, so
+        results computed from the earlier reads can be reused.
+        """
+        pool = get_pool()
+        return id(pool), pool.data_version()
+    
+    def get_dashboard_snapshot(self, event_limit: int = 10,
+                               events_since: Optional[int] = None) -> "DashboardSnapshot":
+        """
+        Get everything the live dashboard shows in one connection checkout.
+
+        The reads share one read transaction, so the figures come from a single
+        snapshot even while writes commit between them.
+
+        Args:
+            event_limit: Number of recent events to include
+            events_since: Only include events newer than this epoch-microsecond
+                timestamp (see get_recent_events)
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute(_SQL_COUNT_ACTIVE_SESSIONS)
+                active_count = cursor.fetchone()[0]
+                cursor.execute(_SQL_METRICS_SUMMARY)
+                row = cursor.fetchone()
+                metrics_summary = dict(row) if row else {}
+                cursor.execute(_SQL_SESSION_STATUS_COUNTS)
+                status_dist = {row['status']: row['count'] for row in cursor.fetchall()}
+                recent_events = (
+                    _select_recent_events(cursor, event_limit, since_ts=events_since)
+                    if event_limit else []
+                )
+            finally:
+                # Nothing was written; ending the transaction releases the snapshot
+                conn.rollback()
+        return DashboardSnapshot(active_count, metrics_summary, status_dist, recent_events)
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Live dashboard figures read by DatabaseManager.get_dashboard_snapshot()."""
+    active_count: int
+    metrics_summary: Dict[str, Any]
+    status_dist: Dict[str, int]
+    recent_events: List[sqlite3.Row]
+
+
+def _select_recent_events(cursor: sqlite3.Cursor, limit: int,
+                          after_ts: Optional[int] = None,
+                          level: Optional[str] = None,
+                          since_ts: Optional[int] = None) -> List[sqlite3.Row]:
+    conditions: List[str] = []
+    params: List[Any] = []
+    if after_ts is not None:
+        conditions.append("timestamp < ?")
+        params.append(after_ts)
+    if since_ts is not None:
+        conditions.append("timestamp > ?")
+        params.append(since_ts)
+    if level is not None and level.upper() != "ALL":
+        # Event types are stored as the lower-case EventType values
+        conditions.append("event_type = ?")
+        params.append(level.lower())
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    events: List[sqlite3.Row] = []
+    # Walk shards newest first and stop once the page is full
+    for shard in _list_shards(cursor.connection, "system_events"):
+        remaining = limit - len(events)
+        if remaining <= 0:
+            break
+        if after_ts is not None and _shard_start_us(shard) >= after_ts:
+            continue
+        cursor.execute(_SQL_SELECT_RECENT_EVENTS.format(shard=shard, where=where),
+                       (*params, remaining))
+        events.extend(cursor.fetchall())
+        if since_ts is not None and _shard_start_us(shard) <= since_ts:
+            # Older shards end before since_ts
+            break
+    return events
+
+
+def _session_row(session: AgentSession) -> tuple:
+    return (
+        session.id,
+        session.agent_name,
+        session.status,
+        to_epoch_us(session.start_time),
+        to_epoch_us(session.end_time),
+        _pack(session.configuration),
+        _pack(session.metadata)
+    )
+
+
+def _session_update_row(session: AgentSession) -> tuple:
+    return (session.id, session.status, to_epoch_us(session.end_time))
+
+
+def _conversation_row(conversation: Conversation) -> tuple:
+    return (
+        conversation.id,
+        conversation.session_id,
+        to_epoch_us(conversation.start_time),
+        to_epoch_us(conversation.end_time),
+        _pack(conversation.context),
+        _pack(conversation.token_usage)
+    )
+
+
+def _message_row(item: Tuple[Message, str]) -> tuple:
+    message, conversation_id = item
+    return (
+        message.id,
+        conversation_id,
+        message.role,
+        message.content,
+        to_epoch_us(message.timestamp),
+        _pack(message.metadata),
+        _pack(message.tool_calls)
+    )
+
+
+def _metrics_row(metrics: PerformanceMetrics) -> tuple:
+    return (
+        metrics.id,
+        metrics.session_id,
+        metrics.conversation_id,
+        metrics.response_time_ms,
+        metrics.token_count_input,
+        metrics.token_count_output,
+        metrics.success_rate,
+        metrics.error_count,
+        to_epoch_us(metrics.timestamp),
+        _pack(metrics.resource_usage),
+        metrics.quality_score
+    )
+
+
+def _event_row(event: SystemEvent) -> tuple:
+    return (
+        event.id,
+        event.event_type,
+        event.session_id,
+        event.conversation_id,
+        event.message,
+        _pack(event.details),
+        to_epoch_us(event.timestamp),
+        _pack_text(event.stack_trace)
+    )
+
+
+# Row kinds accepted by DatabaseManager.bulk_insert(): (statement, row builder).
+# Every row starts with the id of the record it writes.
+_BULK_INSERTS = {
+    "session": (_SQL_INSERT_SESSION, _session_row),
+    "conversation": (_SQL_INSERT_CONVERSATION, _conversation_row),
+    "message": (_SQL_INSERT_MESSAGE, _message_row),
+    "metrics": (_SQL_INSERT_METRICS, _metrics_row),
+    "event": (_SQL_INSERT_EVENT, _event_row),
+    "session_update": (_SQL_UPDATE_SESSION, _session_update_row),
+}
+
+# Kinds stored in monthly shards: (table, index of the timestamp in the row)
+_SHARDED_KINDS = {
+    "message": ("messages", 4),
+    "event": ("system_events", 6),
+}
+
+
+# Rows read back from the database were validated on the way in, so models
+# are rebuilt with model_construct() rather than re-running validation.
+
+def _session_from_row(row: sqlite3.Row, full: bool = False) -> AgentSession:
+    session = AgentSession.model_construct(
+        id=row['id'],
+        agent_name=row['agent_name'],
+        status=row['status'],
+        start_time=from_epoch_us(row['start_time']),
+        end_time=from_epoch_us(row['end_time'])
+    )
+    if full:
+        session.configuration = _unpack(row['configuration']) if row['configuration'] else {}
+        session.metadata = _unpack(row['metadata']) if row['metadata'] else {}
+    return session
+
+
+def _event_from_row(row: sqlite3.Row, full: bool = False) -> SystemEvent:
+    extra = {}
+    if full:
+        extra = {
+            "details": _unpack(row['details']) if row['details'] else {},
+            "stack_trace": _unpack_text(row['stack_trace']),
+        }
+    return SystemEvent.model_construct(
+        id=row['id'],
+        event_type=row['event_type'],
+        session_id=row['session_id'],
+        conversation_id=row['conversation_id'],
+        message=row['message'],
+        timestamp=from_epoch_us(row['timestamp']),
+        **extra
+    )
 
 
 # Global database manager instance
-db = DatabaseManager()
\ No newline at end of file
+db = DatabaseManager()
+# Registered after close_pool so queued rows are written before the pool closes
+atexit.register(db.flush)
\ No newline at end of file
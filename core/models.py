@@ -4,7 +4,7 @@ Pydantic data models for the AI Agent Observability Tool.
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AgentStatus(str, Enum):
@@ -33,6 +33,8 @@ class EventType(str, Enum):
 
 class AgentSession(BaseModel):
     """Agent session data model."""
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str = Field(..., description="Unique session identifier")
     agent_name: str = Field(..., description="Name of the agent")
     status: AgentStatus = Field(default=AgentStatus.ACTIVE)
@@ -40,26 +42,24 @@ class AgentSession(BaseModel):
     end_time: Optional[datetime] = None
     configuration: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    
-    class Config:
-        use_enum_values = True
 
 
 class Message(BaseModel):
     """Individual message within a conversation."""
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
+
     id: str = Field(..., description="Unique message identifier")
     role: MessageRole = Field(..., description="Role of the message sender")
     content: str = Field(..., description="Message content")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     tool_calls: Optional[List[Dict[str, Any]]] = None
-    
-    class Config:
-        use_enum_values = True
 
 
 class Conversation(BaseModel):
     """Conversation data model."""
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str = Field(..., description="Unique conversation identifier")
     session_id: str = Field(..., description="Associated session ID")
     messages: List[Message] = Field(default_factory=list)
@@ -67,13 +67,12 @@ class Conversation(BaseModel):
     end_time: Optional[datetime] = None
     context: Dict[str, Any] = Field(default_factory=dict)
     token_usage: Dict[str, int] = Field(default_factory=dict)
-    
-    class Config:
-        use_enum_values = True
 
 
 class PerformanceMetrics(BaseModel):
     """Performance metrics data model."""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Unique metrics identifier")
     session_id: str = Field(..., description="Associated session ID")
     conversation_id: Optional[str] = None
@@ -89,6 +88,8 @@ class PerformanceMetrics(BaseModel):
 
 class SystemEvent(BaseModel):
     """System event data model."""
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
+
     id: str = Field(..., description="Unique event identifier")
     event_type: EventType = Field(..., description="Type of event")
     session_id: Optional[str] = None
@@ -97,9 +98,6 @@ class SystemEvent(BaseModel):
     details: Dict[str, Any] = Field(default_factory=dict)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     stack_trace: Optional[str] = None
-    
-    class Config:
-        use_enum_values = True
 
 
 class AgentConfiguration(BaseModel):
@@ -13,10 +13,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from integrations.crewai_integration import CrewAIObserver, monitor_crewai_task, EHRCrewAIWrapper
+import asyncio
 import time
 import random
 
-def simulate_ehr_processing():
+async def simulate_ehr_processing():
     """
     Simulate a CrewAI workflow processing EHR data.
     Replace with your actual CrewAI implementation.
@@ -66,11 +67,11 @@ def simulate_ehr_processing():
         "Medication list includes ACE inhibitors..."
     ]
     
-    for i, (agent, task) in enumerate(zip(agents, tasks)):
+    async def run_agent(i: int, agent: str, task: str):
         print(f"\n🤖 {agent} processing: {task[:50]}...")
         
         # Simulate task execution with monitoring
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             # This is where your actual CrewAI agent would execute
@@ -79,7 +80,7 @@ def simulate_ehr_processing():
             
             # Simulate processing time
             processing_time = random.uniform(0.5, 3.0)
-            time.sleep(processing_time / 10)  # Speed up for demo
+            await asyncio.sleep(processing_time / 10)  # Speed up for demo
             
             # Simulate agent response
             if "Extract" in task:
@@ -91,9 +92,11 @@ def simulate_ehr_processing():
             else:
                 response = "Compliance: HIPAA requirements validated, data secure"
             
-            execution_time = (time.time() - start_time) * 1000
+            execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
-            # Log the interaction (automatically sanitizes sensitive data)
+            # Log the interaction (automatically sanitizes sensitive data).
+            # Messages and metrics are queued for the background writer, so
+            # this doesn't hold up the other agents.
             observer.log_agent_interaction(
                 crew_name=crew_name,
                 agent_name=agent,
@@ -104,7 +107,7 @@ def simulate_ehr_processing():
                 token_usage={"input": random.randint(100, 500), "output": random.randint(50, 300)}
             )
             
-            print(f"   ⏱️  Completed in {execution_time:.1f}ms")
+            print(f"   ⏱️  {agent} completed in {execution_time:.1f}ms")
             
             # Simulate occasional errors for demonstration
             if random.random() < 0.1:  # 10% chance of error
@@ -114,6 +117,12 @@ def simulate_ehr_processing():
             print(f"   ❌ Error: {e}")
             observer.log_error(crew_name, agent, e, {"task": task})
     
+    # Run the agents concurrently
+    await asyncio.gather(*(
+        run_agent(i, agent, task)
+        for i, (agent, task) in enumerate(zip(agents, tasks))
+    ))
+    
     # Complete the session
     observer.end_crew_session(
         crew_name=crew_name, 
@@ -161,7 +170,7 @@ if __name__ == "__main__":
     init_database()
     
     # Run the demonstrations
-    simulate_ehr_processing()
+    asyncio.run(simulate_ehr_processing())
     demonstrate_context_manager()
     
     print("\n🎉 Integration demo complete!")
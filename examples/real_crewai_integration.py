@@ -14,19 +14,66 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from integrations.crewai_integration import CrewAIObserver
+import asyncio
+import hashlib
+import re
 import time
+from collections import OrderedDict
+from typing import Optional
+
+_WORD = re.compile(r"\S+")
+
+
+def _wordcount(text: str) -> int:
+    """Count whitespace-separated words without building a list of them."""
+    return sum(1 for _ in _WORD.finditer(text))
+
+
+# Agent stages run by _execute_agents_individually():
+# stage -> (agent, task, stages whose results it takes as input).
+# Stages without dependencies start on the raw EHR data and run in parallel;
+# a stage starts as soon as everything it depends on has finished.
+PIPELINE = {
+    "extract_history": ("data_extractor", "Extract medical history from EHR", ()),
+    "extract_medications": ("data_extractor", "Extract medications and allergies from EHR", ()),
+    "extract_vitals": ("data_extractor", "Extract vital signs from EHR", ()),
+    "analyze": (
+        "clinical_analyzer",
+        "Analyze extracted medical data",
+        ("extract_history", "extract_medications", "extract_vitals")
+    ),
+    "report": ("report_generator", "Generate medical report", ("analyze",)),
+}
 
 class EHRProcessingCrew:
     """
     Template class showing how to integrate observability with your actual CrewAI implementation.
     """
     
-    def __init__(self):
+    def __init__(self, max_parallel_agents: int = 4, timeout_seconds: float = 300.0,
+                 cache_enabled: bool = False, cache_size: int = 256,
+                 cache_ttl_seconds: float = 600.0):
         # Initialize observability
         self.observer = CrewAIObserver("Your EHR Project")
         
+        # Agent calls are I/O bound (LLM requests), so independent stages run
+        # concurrently, at most this many at a time
+        self.max_parallel_agents = max_parallel_agents
+        self.timeout_seconds = timeout_seconds
+        
+        # Optional cache of agent results keyed by (agent, task, input digest),
+        # so retries and duplicate inputs skip the LLM call. Off by default:
+        # only enable it for agents whose output is safe to reuse.
+        self.cache_enabled = cache_enabled
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._result_cache: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+        
         # Your CrewAI agents (replace with your actual agents)
         self.agents = self._create_agents()
+        # Reused for every session this crew starts
+        self._agent_names = tuple(self.agents.keys())
+        self._task_names = ("Data extraction", "Clinical analysis", "Report generation")
         self.tasks = self._create_tasks()
         self.crew = self._create_crew()
         
@@ -106,7 +153,7 @@ class EHRProcessingCrew:
         
         return None  # Replace with your actual crew
     
-    def process_ehr_data(self, ehr_data: str, patient_id: str = None):
+    async def process_ehr_data(self, ehr_data: str, patient_id: str = None):
         """
         Process EHR data with full observability monitoring.
         
@@ -120,8 +167,8 @@ class EHRProcessingCrew:
         # 1. START MONITORING SESSION
         session_id = self.observer.start_crew_session(
             crew_name="EHR_Processing_Crew",
-            agents=list(self.agents.keys()),
-            tasks=["Data extraction", "Clinical analysis", "Report generation"],
+            agents=self._agent_names,
+            tasks=self._task_names,
             metadata={
                 "patient_id": patient_id or "[REDACTED]",
                 "data_size": len(ehr_data),
@@ -133,13 +180,15 @@ class EHRProcessingCrew:
             # 2. EXECUTE YOUR CREWAI WORKFLOW WITH MONITORING
             
             # If using CrewAI's kickoff method:
-            # result = self._execute_with_monitoring(ehr_data)
+            # result = await self._execute_with_monitoring(ehr_data)
             
             # If executing agents individually:
-            result = self._execute_agents_individually(ehr_data, session_id)
+            result = await self._execute_agents_individually(ehr_data, session_id)
             
             # 3. END SESSION SUCCESSFULLY
-            self.observer.end_crew_session(
+            # (ending a session waits for queued log writes, so it runs off the loop)
+            await asyncio.to_thread(
+                self.observer.end_crew_session,
                 crew_name="EHR_Processing_Crew",
                 success=True,
                 summary=f"Successfully processed EHR data for patient {patient_id or '[REDACTED]'}"
@@ -150,29 +199,31 @@ class EHRProcessingCrew:
         except Exception as e:
             # 4. HANDLE ERRORS
             self.observer.log_error("EHR_Processing_Crew", "crew_execution", e)
-            self.observer.end_crew_session(
+            await asyncio.to_thread(
+                self.observer.end_crew_session,
                 crew_name="EHR_Processing_Crew",
                 success=False,
                 summary=f"Failed to process EHR data: {str(e)}"
             )
             raise
     
-    def _execute_with_monitoring(self, ehr_data: str):
+    async def _execute_with_monitoring(self, ehr_data: str):
         """
         Execute CrewAI crew with monitoring - OPTION 1: Full crew execution
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Your actual CrewAI execution
-        # result = self.crew.kickoff(inputs={'ehr_data': ehr_data})
+        # result = await self.crew.kickoff_async(inputs={'ehr_data': ehr_data})
         
         # Simulated execution for template
         result = f"Processed {len(ehr_data)} characters of EHR data"
         
-        execution_time = (time.time() - start_time) * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
         
         # Log the overall crew execution
-        self.observer.log_agent_interaction(
+        await asyncio.to_thread(
+            self.observer.log_agent_interaction,
             crew_name="EHR_Processing_Crew",
             agent_name="full_crew",
             task="Complete EHR processing workflow",
@@ -183,70 +234,74 @@ class EHRProcessingCrew:
         
         return result
     
-    def _execute_agents_individually(self, ehr_data: str, session_id: str):
+    async def _execute_agents_individually(self, ehr_data: str, session_id: str):
         """
         Execute each agent individually with monitoring - OPTION 2: Individual agent monitoring
+        
+        Stages follow PIPELINE: independent extractions fan out as concurrent
+        tasks and fan back in to analysis and the final report.
         """
+        limit = asyncio.Semaphore(self.max_parallel_agents)
+        stages = {}
         
-        # Stage 1: Data Extraction
-        extraction_result = self._execute_agent_with_monitoring(
-            agent_name="data_extractor",
-            task="Extract medical data from EHR",
-            input_data=ehr_data,
-            crew_name="EHR_Processing_Crew"
-        )
+        async def run_stage(stage: str) -> str:
+            agent_name, task, deps = PIPELINE[stage]
+            inputs = await asyncio.gather(*(stages[dep] for dep in deps))
+            async with limit:
+                return await self._execute_agent_with_monitoring(
+                    agent_name=agent_name,
+                    task=task,
+                    input_data="\n".join(inputs) if deps else ehr_data,
+                    crew_name="EHR_Processing_Crew"
+                )
         
-        # Stage 2: Clinical Analysis  
-        analysis_result = self._execute_agent_with_monitoring(
-            agent_name="clinical_analyzer",
-            task="Analyze extracted medical data",
-            input_data=extraction_result,
-            crew_name="EHR_Processing_Crew"
-        )
+        for stage in PIPELINE:
+            stages[stage] = asyncio.create_task(run_stage(stage))
         
-        # Stage 3: Report Generation
-        report_result = self._execute_agent_with_monitoring(
-            agent_name="report_generator", 
-            task="Generate medical report",
-            input_data=analysis_result,
-            crew_name="EHR_Processing_Crew"
-        )
+        try:
+            done, pending = await asyncio.wait(
+                stages.values(), timeout=self.timeout_seconds,
+                return_when=asyncio.FIRST_EXCEPTION
+            )
+            for stage_task in done:
+                stage_task.result()  # re-raise the first stage failure
+            if pending:
+                unfinished = sorted(stage for stage, t in stages.items() if t in pending)
+                raise TimeoutError(
+                    f"Agent stages did not finish within {self.timeout_seconds}s: {unfinished}"
+                )
+        finally:
+            for stage_task in stages.values():
+                stage_task.cancel()
         
-        return report_result
+        return stages["report"].result()
     
-    def _execute_agent_with_monitoring(self, agent_name: str, task: str, input_data: str, crew_name: str):
+    async def _execute_agent_with_monitoring(self, agent_name: str, task: str, input_data: str, crew_name: str):
         """
         Execute a single agent with monitoring.
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
-            # YOUR ACTUAL AGENT EXECUTION GOES HERE
-            # Replace this with your actual CrewAI agent execution:
-            
-            # Real implementation would be:
-            # agent = self.agents[agent_name]
-            # result = agent.execute_task(task, input_data)
-            
-            # Simulated execution for template:
-            if "extract" in task.lower():
-                result = "Extracted: Demographics, vitals, medications, allergies"
-            elif "analyze" in task.lower():
-                result = "Analysis: Normal vitals, medication interactions noted"
-            else:
-                result = "Report: Clinical summary with recommendations generated"
+            cache_key = self._cache_key(agent_name, task, input_data) if self.cache_enabled else None
+            result = self._cached_result(cache_key)
+            if result is None:
+                result = await self._run_agent(agent_name, task, input_data)
+                self._store_result(cache_key, result)
             
-            execution_time = (time.time() - start_time) * 1000
+            execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
-            # Log the interaction (automatic data sanitization)
-            self.observer.log_agent_interaction(
+            # Log the interaction (automatic data sanitization). Sanitizing runs
+            # regexes over the whole input, so keep it off the event loop.
+            await asyncio.to_thread(
+                self.observer.log_agent_interaction,
                 crew_name=crew_name,
                 agent_name=agent_name,
                 task=task,
                 input_data=input_data,
                 response=result,
                 execution_time_ms=execution_time,
-                token_usage={"input": len(input_data.split()), "output": len(result.split())}
+                token_usage={"input": _wordcount(input_data), "output": _wordcount(result)}
             )
             
             return result
@@ -254,6 +309,53 @@ class EHRProcessingCrew:
         except Exception as e:
             self.observer.log_error(crew_name, agent_name, e, {"task": task})
             raise
+    
+    async def _run_agent(self, agent_name: str, task: str, input_data: str) -> str:
+        """
+        Run one agent on its input.
+        """
+        # YOUR ACTUAL AGENT EXECUTION GOES HERE
+        # Replace this with your actual CrewAI agent execution:
+        
+        # Real implementation would be:
+        # agent = self.agents[agent_name]
+        # if hasattr(agent, "aexecute_task"):
+        #     return await agent.aexecute_task(task, input_data)
+        # return await asyncio.to_thread(agent.execute_task, task, input_data)
+        
+        # Simulated execution for template:
+        if "extract" in task.lower():
+            return "Extracted: Demographics, vitals, medications, allergies"
+        elif "analyze" in task.lower():
+            return "Analysis: Normal vitals, medication interactions noted"
+        else:
+            return "Report: Clinical summary with recommendations generated"
+    
+    def _cache_key(self, agent_name: str, task: str, input_data: str) -> tuple:
+        digest = hashlib.blake2b(input_data.encode(), digest_size=16).digest()
+        return (agent_name, task, digest)
+    
+    def _cached_result(self, key: Optional[tuple]) -> Optional[str]:
+        """Return the cached result for key if it hasn't expired."""
+        if key is None:
+            return None
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at >= self.cache_ttl_seconds:
+            del self._result_cache[key]
+            return None
+        self._result_cache.move_to_end(key)
+        return result
+    
+    def _store_result(self, key: Optional[tuple], result: str):
+        if key is None:
+            return
+        self._result_cache[key] = (time.monotonic(), result)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
 
 
 def main():
@@ -276,7 +378,7 @@ def main():
     
     try:
         # Process EHR data with full observability
-        result = ehr_crew.process_ehr_data(sample_ehr_data, patient_id="12345")
+        result = asyncio.run(ehr_crew.process_ehr_data(sample_ehr_data, patient_id="12345"))
         print("✅ EHR processing completed successfully!")
         print("📊 Check the observability dashboard for monitoring data")
         
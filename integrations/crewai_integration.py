@@ -2,11 +2,20 @@
 CrewAI integration for the AI Agent Observability Tool.
 This module provides seamless integration with CrewAI agents for EHR data processing.
 """
+import os
+import re
 import uuid
 import time
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    import hyperscan
+except ImportError:  # optional: pip install ai-observability-tool[hyperscan]
+    hyperscan = None
 
 from core.database import db
 from core.models import (
@@ -21,6 +30,174 @@ from core.models import (
 )
 
 
+# Basic patterns for common PHI/PII in EHR data, combined into one alternation
+# so content is scanned once. Where two patterns could match at the same
+# position, the earlier one wins. Every match is found against the original
+# text, so PHI that runs straight into an earlier match is still redacted in
+# full ("Mary Jones.mj@example.org" -> "[PATIENT_NAME][EMAIL]").
+_PHI_PATTERNS = {
+    # Patient identifiers
+    "ssn": r'\b\d{3}-\d{2}-\d{4}\b',
+    "mrn": r'\b\d{10,12}\b',  # Medical record numbers
+    "date": r'\b\d{1,2}/\d{1,2}/\d{4}\b',
+    # Names (basic pattern - enhance as needed)
+    "name": r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b',
+    "phone": r'\b\d{3}-\d{3}-\d{4}\b',
+    "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+}
+
+_PHI_REPLACEMENTS = {
+    "ssn": "[SSN]",
+    "mrn": "[MRN]",
+    "date": "[DATE]",
+    "name": "[PATIENT_NAME]",
+    "phone": "[PHONE]",
+    "email": "[EMAIL]",
+}
+
+_PHI_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in _PHI_PATTERNS.items()))
+
+
+def _replace_phi(match: "re.Match[str]") -> str:
+    return _PHI_REPLACEMENTS[match.lastgroup]
+
+
+def _compile_phi_hyperscan() -> "hyperscan.Database":
+    # On str input, re's \s also matches the \x1c-\x1f separators
+    expressions = [pattern.replace(r'\s', r'[\s\x1c-\x1f]').encode() for pattern in _PHI_PATTERNS.values()]
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+    )
+    return database
+
+
+# With Hyperscan installed, the pattern set is compiled once into a single
+# automaton that tells whether any pattern matches much faster than re can.
+# It only serves as a prefilter: content it clears is returned untouched and
+# everything else is redacted by _PHI_RE, so the output is always that of the
+# re path. Hyperscan's classes are ASCII-only, so other content skips it.
+_PHI_HS = _compile_phi_hyperscan() if hyperscan is not None else None
+# A Hyperscan database shares one scratch space, so scans are serialized
+_PHI_HS_LOCK = threading.Lock()
+
+
+def _stop_scan(pattern_id, start, end, flags, context) -> bool:
+    return True
+
+
+def _may_contain_phi(content: str) -> bool:
+    """False only if no PHI pattern can match the ASCII content."""
+    with _PHI_HS_LOCK:
+        try:
+            _PHI_HS.scan(content.encode(), match_event_handler=_stop_scan)
+        except hyperscan.ScanTerminated:
+            return True
+    return False
+
+
+def _sanitize_phi(content: str) -> str:
+    """Replace every PHI match in content with its placeholder."""
+    if _PHI_HS is not None and content.isascii() and not _may_contain_phi(content):
+        return content
+    return _PHI_RE.sub(_replace_phi, content)
+
+
+def _truncate(content: str) -> str:
+    if len(content) > 500:
+        return content[:500] + "...[TRUNCATED]"
+    return content
+
+
+def _sanitize(content: str) -> str:
+    return _truncate(_sanitize_phi(content))
+
+
+# The shortest string any PHI pattern can match ("Ab Cd")
+_MIN_PHI_LEN = 5
+
+
+# Only the first 500 sanitized characters are kept, so longer input is cut to
+# this many characters before scanning. The slack leaves room for names and
+# dates that straddle the 500 mark.
+MAX_RAW_SANITIZE_LEN = 2048
+
+# Agents re-log the same task descriptions and snippets across stages, so
+# sanitized results are cached. Input over MAX_RAW_SANITIZE_LEN bypasses the
+# cache to keep its memory bounded.
+_sanitize_cached = lru_cache(maxsize=4096)(_sanitize)
+
+
+# Metadata keys whose values are always redacted (matched case-insensitively)
+_REDACT_KEYS = frozenset({"patient_id", "ssn", "name", "email", "phone", "dob", "mrn"})
+
+
+# Ids are cut from a pool of random bytes refilled 256 at a time, instead of
+# one os.urandom() call per uuid4()
+_ID_BATCH = 256
+_id_pool = bytearray()
+_id_lock = threading.Lock()
+
+
+def _new_id() -> str:
+    """Return a random (version 4) UUID string."""
+    with _id_lock:
+        if not _id_pool:
+            _id_pool.extend(os.urandom(16 * _ID_BATCH))
+        raw = bytes(_id_pool[-16:])
+        del _id_pool[-16:]
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+def _reset_ids_after_fork():
+    # A forked child must not hand out the parent's remaining bytes again
+    global _id_lock
+    _id_pool.clear()
+    _id_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_ids_after_fork)
+
+
+# Task descriptions repeat across a crew's interactions, so classifications
+# are memoized
+@lru_cache(maxsize=1024)
+def _classify_task(task: str) -> str:
+    """Classify the type of task for categorization."""
+    task_lower = task.lower()
+    if 'analyze' in task_lower or 'review' in task_lower:
+        return 'ANALYSIS'
+    elif 'extract' in task_lower or 'parse' in task_lower:
+        return 'EXTRACTION'
+    elif 'summarize' in task_lower or 'summary' in task_lower:
+        return 'SUMMARIZATION'
+    elif 'validate' in task_lower or 'check' in task_lower:
+        return 'VALIDATION'
+    else:
+        return 'GENERAL'
+
+
+@lru_cache(maxsize=1024)
+def _interaction_metadata(agent_name: str, task_category: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Message metadata and metrics resource usage for one agent and task category.
+
+    The dicts are shared by every interaction logged for that pair and must not
+    be modified.
+    """
+    message_metadata = {
+        "agent": agent_name,
+        "task_type": task_category,
+        "data_classification": "SANITIZED_EHR"
+    }
+    resource_usage = {"agent": agent_name, "task_category": task_category}
+    return message_metadata, resource_usage
+
+
 class CrewAIObserver:
     """
     Observer class to monitor CrewAI agents and log to the observability tool.
@@ -29,28 +206,32 @@ class CrewAIObserver:
     
     def __init__(self, project_name: str = "EHR Processing"):
         self.project_name = project_name
-        self.active_sessions: Dict[str, str] = {}  # crew_id -> session_id
-        self.conversation_contexts: Dict[str, str] = {}  # crew_id -> conversation_id
+        self.active_sessions: Dict[str, str] = {}  # crew_name -> session_id
+        # session_id -> the session as created, updated in place when it ends
+        self._session_handles: Dict[str, AgentSession] = {}
+        # (session_id, agent_name, task category) -> conversation_id
+        self.conversation_contexts: Dict[Tuple[str, str, str], str] = {}
+        # Agents of one crew may log from several threads at once
+        self._conversation_lock = threading.Lock()
         
     def start_crew_session(self, 
                           crew_name: str,
-                          agents: List[str],
-                          tasks: List[str],
+                          agents: Sequence[str],
+                          tasks: Sequence[str],
                           metadata: Optional[Dict[str, Any]] = None) -> str:
         """
         Start monitoring a CrewAI session.
         
         Args:
             crew_name: Name of the crew
-            agents: List of agent names in the crew
-            tasks: List of task descriptions
+            agents: Agent names in the crew (a tuple can be shared across sessions)
+            tasks: Task descriptions
             metadata: Additional metadata (sanitized)
         
         Returns:
             Session ID for tracking
         """
-        session_id = str(uuid.uuid4())
-        crew_id = f"crew_{crew_name}_{int(time.time())}"
+        session_id = _new_id()
         
         # Sanitize metadata to remove any PII/PHI
         safe_metadata = self._sanitize_metadata(metadata or {})
@@ -75,8 +256,9 @@ class CrewAIObserver:
             metadata=safe_metadata
         )
         
-        db.create_session(session)
-        self.active_sessions[crew_id] = session_id
+        db.add_session(session)
+        self.active_sessions[crew_name] = session_id
+        self._session_handles[session_id] = session
         
         # Log start event
         self._log_event(
@@ -113,29 +295,30 @@ class CrewAIObserver:
             return
         
         # Create or get conversation
-        conversation_id = self._get_or_create_conversation(session_id, agent_name, task)
+        task_category = self._classify_task(task)
+        conversation_id = self._get_or_create_conversation(session_id, agent_name, task_category)
         
         # Sanitize input and response for logging
         safe_input = self._sanitize_ehr_content(input_data)
         safe_response = self._sanitize_ehr_content(response)
         
+        # Every field below is built here from known types, so the models
+        # skip validation; the per-agent dicts are shared between rows
+        message_metadata, resource_usage = _interaction_metadata(agent_name, task_category)
+        
         # Log user message (task input)
-        user_message = Message(
-            id=str(uuid.uuid4()),
-            role=MessageRole.USER,
+        user_message = Message.model_construct(
+            id=_new_id(),
+            role=MessageRole.USER.value,
             content=f"Task: {self._sanitize_task_description(task)}\nInput: {safe_input}",
-            metadata={
-                "agent": agent_name,
-                "task_type": self._classify_task(task),
-                "data_classification": "SANITIZED_EHR"
-            }
+            metadata=message_metadata
         )
         db.add_message(user_message, conversation_id)
         
         # Log agent response
-        agent_message = Message(
-            id=str(uuid.uuid4()),
-            role=MessageRole.ASSISTANT,
+        agent_message = Message.model_construct(
+            id=_new_id(),
+            role=MessageRole.ASSISTANT.value,
             content=safe_response,
             metadata={
                 "agent": agent_name,
@@ -146,15 +329,15 @@ class CrewAIObserver:
         db.add_message(agent_message, conversation_id)
         
         # Log performance metrics
-        metrics = PerformanceMetrics(
-            id=str(uuid.uuid4()),
+        metrics = PerformanceMetrics.model_construct(
+            id=_new_id(),
             session_id=session_id,
             conversation_id=conversation_id,
             response_time_ms=execution_time_ms,
             token_count_input=token_usage.get('input', 0) if token_usage else 0,
             token_count_output=token_usage.get('output', 0) if token_usage else 0,
             success_rate=1.0,  # Assume success if we got here
-            resource_usage={"agent": agent_name, "task_category": self._classify_task(task)}
+            resource_usage=resource_usage
         )
         db.add_metrics(metrics)
     
@@ -167,7 +350,7 @@ class CrewAIObserver:
         safe_context = self._sanitize_metadata(context or {})
         
         error_event = SystemEvent(
-            id=str(uuid.uuid4()),
+            id=_new_id(),
             event_type=EventType.ERROR,
             session_id=session_id,
             message=f"Error in agent {agent_name}: {str(error)[:200]}...",
@@ -187,11 +370,11 @@ class CrewAIObserver:
             return
         
         # Update session status
-        session = db.get_session(session_id)
+        session = self._session_handles.pop(session_id, None)
         if session:
             session.status = AgentStatus.IDLE if success else AgentStatus.ERROR
             session.end_time = datetime.utcnow()
-            # Note: In a real implementation, you'd update the session in the database
+            db.update_session(session)
         
         # Log completion event
         self._log_event(
@@ -205,38 +388,54 @@ class CrewAIObserver:
         )
         
         # Clean up tracking
-        crew_id = f"crew_{crew_name}_{int(time.time())}"
-        if crew_id in self.active_sessions:
-            del self.active_sessions[crew_id]
+        self.active_sessions.pop(crew_name, None)
+        
+        self.flush()
+    
+    def flush(self):
+        """
+        Wait until everything logged so far has been written.
+
+        Sessions, conversations, interactions and events are queued and
+        committed in batches by the database's background writer, so agents
+        never wait on disk I/O while logging.
+        """
+        db.flush()
     
     # Private helper methods
     
     def _get_session_id(self, crew_name: str) -> Optional[str]:
         """Get session ID for a crew name."""
-        for crew_id, session_id in self.active_sessions.items():
-            if crew_name in crew_id:
-                return session_id
-        return None
+        return self.active_sessions.get(crew_name)
     
-    def _get_or_create_conversation(self, session_id: str, agent_name: str, task: str) -> str:
-        """Get or create a conversation for this agent and task."""
-        conversation_key = f"{session_id}_{agent_name}_{self._classify_task(task)}"
+    def _get_or_create_conversation(self, session_id: str, agent_name: str, task_category: str) -> str:
+        """Get or create a conversation for this agent and task category."""
+        conversation_key = (session_id, agent_name, task_category)
         
-        if conversation_key not in self.conversation_contexts:
-            conversation_id = str(uuid.uuid4())
+        # Existing conversations are found without taking the lock; only
+        # creation needs it, and re-checks in case another thread won
+        conversation_id = self.conversation_contexts.get(conversation_key)
+        if conversation_id is not None:
+            return conversation_id
+        
+        with self._conversation_lock:
+            conversation_id = self.conversation_contexts.get(conversation_key)
+            if conversation_id is not None:
+                return conversation_id
+            
+            conversation_id = _new_id()
             conversation = Conversation(
                 id=conversation_id,
                 session_id=session_id,
                 context={
                     "agent": agent_name,
-                    "task_category": self._classify_task(task),
+                    "task_category": task_category,
                     "data_type": "EHR_SANITIZED"
                 }
             )
-            db.create_conversation(conversation)
+            db.add_conversation(conversation)
             self.conversation_contexts[conversation_key] = conversation_id
-        
-        return self.conversation_contexts[conversation_key]
+            return conversation_id
     
     def _sanitize_ehr_content(self, content: str) -> str:
         """
@@ -245,29 +444,18 @@ class CrewAIObserver:
         """
         if not content:
             return ""
-        
-        # Basic patterns for common PHI/PII in EHR data
-        import re
-        
-        # Patient identifiers
-        content = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', content)  # SSN
-        content = re.sub(r'\b\d{10,12}\b', '[MRN]', content)  # Medical record numbers
-        content = re.sub(r'\b\d{1,2}/\d{1,2}/\d{4}\b', '[DATE]', content)  # Dates
-        
-        # Names (basic pattern - enhance as needed)
-        content = re.sub(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b', '[PATIENT_NAME]', content)
-        
-        # Phone numbers
-        content = re.sub(r'\b\d{3}-\d{3}-\d{4}\b', '[PHONE]', content)
-        
-        # Email addresses
-        content = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', content)
-        
-        # Truncate if too long
-        if len(content) > 500:
-            content = content[:500] + "...[TRUNCATED]"
-        
-        return content
+        # Bare identifiers such as agent names contain no whitespace, "@", "/"
+        # or "-" and no digit run at a word boundary, so nothing can match
+        if len(content) < _MIN_PHI_LEN or content.isidentifier():
+            return _truncate(content)
+        if len(content) > MAX_RAW_SANITIZE_LEN:
+            sanitized = _sanitize_phi(content[:MAX_RAW_SANITIZE_LEN])
+            return sanitized[:500] + "...[TRUNCATED]"
+        return _sanitize_cached(content)
+    
+    def sanitize_cache_info(self):
+        """Hit/miss statistics of the sanitized-string cache, for tuning."""
+        return _sanitize_cached.cache_info()
     
     def _sanitize_task_description(self, task: str) -> str:
         """Sanitize task descriptions to remove sensitive information."""
@@ -277,23 +465,13 @@ class CrewAIObserver:
     
     def _classify_task(self, task: str) -> str:
         """Classify the type of task for categorization."""
-        task_lower = task.lower()
-        if 'analyze' in task_lower or 'review' in task_lower:
-            return 'ANALYSIS'
-        elif 'extract' in task_lower or 'parse' in task_lower:
-            return 'EXTRACTION'
-        elif 'summarize' in task_lower or 'summary' in task_lower:
-            return 'SUMMARIZATION'
-        elif 'validate' in task_lower or 'check' in task_lower:
-            return 'VALIDATION'
-        else:
-            return 'GENERAL'
+        return _classify_task(task)
     
     def _sanitize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize metadata to remove sensitive information."""
         safe_metadata = {}
         for key, value in metadata.items():
-            if key.lower() in ['patient_id', 'ssn', 'name', 'email', 'phone']:
+            if (key if key.islower() else key.lower()) in _REDACT_KEYS:
                 safe_metadata[key] = '[REDACTED]'
             elif isinstance(value, str):
                 safe_metadata[key] = self._sanitize_ehr_content(value)
@@ -304,7 +482,7 @@ class CrewAIObserver:
     def _log_event(self, session_id: str, event_type: EventType, message: str, details: Dict[str, Any]):
         """Log a system event."""
         event = SystemEvent(
-            id=str(uuid.uuid4()),
+            id=_new_id(),
             event_type=event_type,
             session_id=session_id,
             message=message,
@@ -324,13 +502,13 @@ def monitor_crewai_task(observer: CrewAIObserver, crew_name: str, agent_name: st
             # Your CrewAI task execution here
             result = agent.execute(task)
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     try:
         yield
-        execution_time = (time.time() - start_time) * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
         # Note: In actual usage, you'd log the successful completion here
     except Exception as e:
-        execution_time = (time.time() - start_time) * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
         observer.log_error(crew_name, agent_name, e, {"execution_time_ms": execution_time})
         raise
 
@@ -371,7 +549,7 @@ class EHRCrewAIWrapper:
         Example of how to process data with monitoring.
         Replace with your actual CrewAI execution logic.
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             # This is where you'd call your actual CrewAI agent
@@ -380,7 +558,7 @@ class EHRCrewAIWrapper:
             
             # Simulated processing
             result = f"Processed {len(input_data)} characters of EHR data"
-            execution_time = (time.time() - start_time) * 1000
+            execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # Log the interaction
             self.observer.log_agent_interaction(
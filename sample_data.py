@@ -1,10 +1,14 @@
 """
 Script to add sample data for testing the observability tool.
 """
+import hashlib
+import os
+import sqlite3
 import uuid
 from datetime import datetime, timedelta
+from pathlib import Path
 
-from core.database import init_database, db
+from core.database import init_database, db, get_connection, EncodedJSON
 from core.models import (
     AgentSession, 
     AgentStatus, 
@@ -16,116 +20,194 @@ from core.models import (
     EventType
 )
 
-def create_sample_data():
-    """Create sample data for testing."""
+# Bump to invalidate cached fixtures without touching the generator
+FIXTURE_VERSION = 1
+CACHE_DIR = Path(".cache")
+
+# Session configuration and metadata shared by every run, encoded to JSON once.
+# The models are built without validation, which would otherwise have copied
+# these into each session, so they are read-only to make the sharing safe.
+_GPT4_CFG = EncodedJSON({"model": "gpt-4", "temperature": 0.7, "max_tokens": 2048})
+_CLAUDE_CFG = EncodedJSON({"model": "claude-3", "temperature": 0.5, "max_tokens": 4096})
+_GPT35_CFG = EncodedJSON({"model": "gpt-3.5-turbo", "temperature": 0.3, "max_tokens": 1024})
+_PROD_META = EncodedJSON({"environment": "production", "version": "1.0"})
+_STAGING_META = EncodedJSON({"environment": "staging", "version": "1.1"})
+_DEV_META = EncodedJSON({"environment": "development", "version": "0.9"})
+
+
+def _fixture_cache_path() -> Path:
+    """Cached fixture file, keyed by the schema and this generator's source."""
+    with get_connection() as conn:
+        schema = "\n".join(
+            row[0] for row in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY name"
+            )
+        )
+    digest = hashlib.sha1()
+    digest.update(schema.encode())
+    digest.update(Path(__file__).read_bytes())
+    return CACHE_DIR / f"sample_fixture_v{FIXTURE_VERSION}_{digest.hexdigest()[:8]}.db"
+
+
+def _database_is_empty() -> bool:
+    """True if no table (shards included) holds a row; restoring replaces the file."""
+    with get_connection() as conn:
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+        ]
+        return not any(
+            conn.execute(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone()
+            for table in tables
+        )
+
+
+def _restore_fixture(cache_path: Path):
+    source = sqlite3.connect(cache_path)
+    try:
+        with get_connection(write=True) as conn:
+            source.backup(conn)
+    finally:
+        source.close()
+
+
+def _save_fixture(cache_path: Path):
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    target = sqlite3.connect(tmp_path)
+    try:
+        with get_connection(write=True) as conn:
+            conn.backup(target)
+    finally:
+        target.close()
+    os.replace(tmp_path, cache_path)
+
+
+def _new_ids(batch: int = 16):
+    """Yield uuid4 strings, drawing entropy for ``batch`` ids per os.urandom() call."""
+    while True:
+        raw = os.urandom(16 * batch)
+        for i in range(0, len(raw), 16):
+            yield str(uuid.UUID(bytes=raw[i:i + 16], version=4))
+
+
+def create_sample_data(use_cache: bool = True):
+    """
+    Create sample data for testing.
+
+    The first run against an empty database saves the result under .cache/;
+    later runs against an empty database restore that copy instead of
+    regenerating it. Restored rows keep the timestamps of the run that built
+    the cache. A database that already has data is always added to directly.
+    """
     print("Creating sample data...")
     
     # Initialize database
     init_database()
     
+    cache_path = None
+    if use_cache and _database_is_empty():
+        cache_path = _fixture_cache_path()
+        if cache_path.exists():
+            _restore_fixture(cache_path)
+            print(f"Restored sample data from {cache_path}")
+            return
+    
+    # The fixture is known-good, so the models are built without validation
+    new_id = _new_ids().__next__
+    # Every fixture timestamp is an offset from the same moment
+    now = datetime.now()
+    
     # Create sample sessions
-    session1 = AgentSession(
-        id=str(uuid.uuid4()),
+    session1 = AgentSession.model_construct(
+        id=new_id(),
         agent_name="Healthcare Assistant",
-        status=AgentStatus.ACTIVE,
-        start_time=datetime.now() - timedelta(hours=2),
-        configuration={
-            "model": "gpt-4",
-            "temperature": 0.7,
-            "max_tokens": 2048
-        },
-        metadata={"environment": "production", "version": "1.0"}
+        status=AgentStatus.ACTIVE.value,
+        start_time=now - timedelta(hours=2),
+        configuration=_GPT4_CFG,
+        metadata=_PROD_META
     )
     
-    session2 = AgentSession(
-        id=str(uuid.uuid4()),
+    session2 = AgentSession.model_construct(
+        id=new_id(),
         agent_name="Document Analyzer",
-        status=AgentStatus.IDLE,
-        start_time=datetime.now() - timedelta(hours=1),
-        end_time=datetime.now() - timedelta(minutes=30),
-        configuration={
-            "model": "claude-3",
-            "temperature": 0.5,
-            "max_tokens": 4096
-        },
-        metadata={"environment": "staging", "version": "1.1"}
+        status=AgentStatus.IDLE.value,
+        start_time=now - timedelta(hours=1),
+        end_time=now - timedelta(minutes=30),
+        configuration=_CLAUDE_CFG,
+        metadata=_STAGING_META
     )
     
-    session3 = AgentSession(
-        id=str(uuid.uuid4()),
+    session3 = AgentSession.model_construct(
+        id=new_id(),
         agent_name="Data Processor",
-        status=AgentStatus.ERROR,
-        start_time=datetime.now() - timedelta(minutes=45),
-        configuration={
-            "model": "gpt-3.5-turbo",
-            "temperature": 0.3,
-            "max_tokens": 1024
-        },
-        metadata={"environment": "development", "version": "0.9"}
+        status=AgentStatus.ERROR.value,
+        start_time=now - timedelta(minutes=45),
+        configuration=_GPT35_CFG,
+        metadata=_DEV_META
     )
     
     # Save sessions
-    db.create_session(session1)
-    db.create_session(session2)
-    db.create_session(session3)
+    db.create_sessions_bulk([session1, session2, session3])
     print(f"Created sessions: {session1.id[:8]}, {session2.id[:8]}, {session3.id[:8]}")
     
     # Create sample conversations
-    conv1 = Conversation(
-        id=str(uuid.uuid4()),
+    conv1 = Conversation.model_construct(
+        id=new_id(),
         session_id=session1.id,
-        start_time=datetime.now() - timedelta(hours=1, minutes=30),
+        start_time=now - timedelta(hours=1, minutes=30),
         context={"user_id": "user123", "topic": "medical_consultation"},
         token_usage={"input": 150, "output": 200}
     )
     
-    conv2 = Conversation(
-        id=str(uuid.uuid4()),
+    conv2 = Conversation.model_construct(
+        id=new_id(),
         session_id=session2.id,
-        start_time=datetime.now() - timedelta(minutes=50),
-        end_time=datetime.now() - timedelta(minutes=35),
+        start_time=now - timedelta(minutes=50),
+        end_time=now - timedelta(minutes=35),
         context={"document_type": "medical_report", "analysis_type": "summary"},
         token_usage={"input": 500, "output": 300}
     )
     
-    db.create_conversation(conv1)
-    db.create_conversation(conv2)
+    db.create_conversations_bulk([conv1, conv2])
     print(f"Created conversations: {conv1.id[:8]}, {conv2.id[:8]}")
     
     # Add sample messages
     messages = [
-        Message(
-            id=str(uuid.uuid4()),
-            role=MessageRole.USER,
+        Message.model_construct(
+            id=new_id(),
+            role=MessageRole.USER.value,
             content="What are the common symptoms of hypertension?",
-            timestamp=datetime.now() - timedelta(hours=1, minutes=25),
+            timestamp=now - timedelta(hours=1, minutes=25),
             metadata={"source": "web_interface"}
         ),
-        Message(
-            id=str(uuid.uuid4()),
-            role=MessageRole.ASSISTANT,
+        Message.model_construct(
+            id=new_id(),
+            role=MessageRole.ASSISTANT.value,
             content="Common symptoms of hypertension include headaches, shortness of breath, nosebleeds, and dizziness. However, many people with high blood pressure have no symptoms at all.",
-            timestamp=datetime.now() - timedelta(hours=1, minutes=24),
+            timestamp=now - timedelta(hours=1, minutes=24),
             metadata={"model_used": "gpt-4", "confidence": 0.95}
         ),
-        Message(
-            id=str(uuid.uuid4()),
-            role=MessageRole.USER,
+        Message.model_construct(
+            id=new_id(),
+            role=MessageRole.USER.value,
             content="Can you analyze this medical report for key findings?",
-            timestamp=datetime.now() - timedelta(minutes=48),
+            timestamp=now - timedelta(minutes=48),
             metadata={"file_uploaded": "report_123.pdf"}
         )
     ]
     
-    for i, msg in enumerate(messages):
-        conv_id = conv1.id if i < 2 else conv2.id
-        db.add_message(msg, conv_id)
+    db.add_messages_bulk([
+        (msg, conv1.id if i < 2 else conv2.id) for i, msg in enumerate(messages)
+    ])
     print(f"Added {len(messages)} sample messages")
     
     # Add performance metrics
     metrics = [
-        PerformanceMetrics(
-            id=str(uuid.uuid4()),
+        PerformanceMetrics.model_construct(
+            id=new_id(),
             session_id=session1.id,
             conversation_id=conv1.id,
             response_time_ms=1250.5,
@@ -135,8 +217,8 @@ def create_sample_data():
             quality_score=0.92,
             resource_usage={"cpu_usage": 15.2, "memory_mb": 128}
         ),
-        PerformanceMetrics(
-            id=str(uuid.uuid4()),
+        PerformanceMetrics.model_construct(
+            id=new_id(),
             session_id=session2.id,
             conversation_id=conv2.id,
             response_time_ms=890.2,
@@ -146,8 +228,8 @@ def create_sample_data():
             quality_score=0.88,
             resource_usage={"cpu_usage": 22.1, "memory_mb": 256}
         ),
-        PerformanceMetrics(
-            id=str(uuid.uuid4()),
+        PerformanceMetrics.model_construct(
+            id=new_id(),
             session_id=session3.id,
             response_time_ms=5000.0,
             token_count_input=50,
@@ -158,46 +240,47 @@ def create_sample_data():
         )
     ]
     
-    for metric in metrics:
-        db.add_metrics(metric)
+    db.add_metrics_bulk(metrics)
     print(f"Added {len(metrics)} performance metrics")
     
     # Add system events
     events = [
-        SystemEvent(
-            id=str(uuid.uuid4()),
-            event_type=EventType.INFO,
+        SystemEvent.model_construct(
+            id=new_id(),
+            event_type=EventType.INFO.value,
             session_id=session1.id,
             message="Agent session started successfully",
             details={"startup_time_ms": 450}
         ),
-        SystemEvent(
-            id=str(uuid.uuid4()),
-            event_type=EventType.WARNING,
+        SystemEvent.model_construct(
+            id=new_id(),
+            event_type=EventType.WARNING.value,
             session_id=session2.id,
             message="High token usage detected",
             details={"token_count": 800, "threshold": 500}
         ),
-        SystemEvent(
-            id=str(uuid.uuid4()),
-            event_type=EventType.ERROR,
+        SystemEvent.model_construct(
+            id=new_id(),
+            event_type=EventType.ERROR.value,
             session_id=session3.id,
             message="Connection timeout to external API",
             details={"api_endpoint": "https://api.example.com", "timeout_ms": 5000},
             stack_trace="TimeoutError: Request timed out after 5000ms"
         ),
-        SystemEvent(
-            id=str(uuid.uuid4()),
-            event_type=EventType.DEBUG,
+        SystemEvent.model_construct(
+            id=new_id(),
+            event_type=EventType.DEBUG.value,
             message="System health check completed",
             details={"memory_usage": "512MB", "cpu_usage": "15%", "active_connections": 3}
         )
     ]
     
-    for event in events:
-        db.add_event(event)
+    db.add_events_bulk(events)
     print(f"Added {len(events)} system events")
     
+    if cache_path is not None:
+        _save_fixture(cache_path)
+    
     print("Sample data creation completed!")
 
 if __name__ == "__main__":
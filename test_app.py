@@ -6,6 +6,7 @@ from ui.dashboard import create_dashboard
 from ui.analytics import create_analytics
 from ui.config import create_config
 from ui.debug import create_debug
+from ui.lazy import lazy_tab
 from core.database import init_database
 
 def test_gradio_app():
@@ -24,14 +25,11 @@ def test_gradio_app():
             with gr.Tab("Live Dashboard"):
                 create_dashboard()
             
-            with gr.Tab("Analytics"):
-                create_analytics()
+            lazy_tab("Analytics", create_analytics)
             
-            with gr.Tab("Configuration"):
-                create_config()
+            lazy_tab("Configuration", create_config)
             
-            with gr.Tab("Debug Console"):
-                create_debug()
+            lazy_tab("Debug Console", create_debug)
     
     print("Gradio interface created successfully!")
     print("Interface components:")
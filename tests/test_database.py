@@ -0,0 +1,72 @@
+"""
+Encoding of JSON column values.
+"""
+import copy
+import pickle
+from datetime import datetime
+
+import pytest
+
+import core.database as database
+from core.database import EncodedJSON, _pack, _unpack, close_pool, db, init_database
+from core.models import AgentSession, AgentStatus
+
+CONFIGURATION = {"model": "gpt-4", "temperature": 0.7}
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", tmp_path / "observability.db")
+    init_database()
+    yield
+    close_pool()
+
+
+def test_encoded_json_packs_its_own_encoding():
+    value = EncodedJSON(CONFIGURATION)
+    assert value == CONFIGURATION
+    assert _unpack(_pack(value)) == CONFIGURATION
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda value: value.__setitem__("model", "gpt-3.5-turbo"),
+    lambda value: value.__delitem__("model"),
+    lambda value: value.update(model="gpt-3.5-turbo"),
+    lambda value: value.__ior__({"model": "gpt-3.5-turbo"}),
+    lambda value: value.setdefault("max_tokens", 1024),
+    lambda value: value.pop("model"),
+    lambda value: value.popitem(),
+    lambda value: value.clear(),
+])
+def test_encoded_json_cannot_be_mutated(mutate):
+    value = EncodedJSON(CONFIGURATION)
+    with pytest.raises(TypeError):
+        mutate(value)
+    assert value == CONFIGURATION
+    assert _unpack(_pack(value)) == CONFIGURATION
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, lambda v: pickle.loads(pickle.dumps(v))])
+def test_encoded_json_copies_keep_their_encoding(clone):
+    value = clone(EncodedJSON(CONFIGURATION))
+    assert type(value) is EncodedJSON
+    assert _unpack(_pack(value)) == CONFIGURATION
+
+
+def test_shared_encoded_json_cannot_write_stale_json(fresh_db):
+    shared = EncodedJSON(CONFIGURATION)
+    sessions = [
+        AgentSession.model_construct(
+            id=session_id, agent_name="Agent", status=AgentStatus.IDLE.value,
+            start_time=datetime(2024, 1, 15), configuration=shared, metadata={}
+        )
+        for session_id in ("s1", "s2")
+    ]
+    with pytest.raises(TypeError):
+        sessions[0].configuration["temperature"] = 0.0
+    # Replacing the value is how a single session's configuration changes
+    sessions[1].configuration = {**shared, "temperature": 0.0}
+    db.create_sessions_bulk(sessions)
+
+    assert db.get_session("s1").configuration == CONFIGURATION
+    assert db.get_session("s2").configuration == {**CONFIGURATION, "temperature": 0.0}
@@ -0,0 +1,53 @@
+"""
+Lazily built tabs of the application interface.
+"""
+import asyncio
+
+import gradio as gr
+import pytest
+from gradio.state_holder import SessionState
+
+import core.database as database
+from core.database import init_database, close_pool
+from app import create_app
+
+
+@pytest.fixture
+def demo(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", tmp_path / "observability.db")
+    init_database()
+    yield create_app()
+    close_pool()
+
+
+def _tab(demo: gr.Blocks, label: str) -> gr.Tab:
+    return next(
+        block for block in demo.blocks.values()
+        if isinstance(block, gr.Tab) and block.label == label
+    )
+
+
+def _listener(demo: gr.Blocks, block_id: int, event: str):
+    return next(fn for fn in demo.fns.values() if (block_id, event) in fn.targets)
+
+
+@pytest.mark.parametrize("label", ["Analytics", "Configuration", "Debug Console"])
+def test_selecting_a_tab_renders_its_contents(demo, label):
+    state = SessionState(demo)
+    select = _listener(demo, _tab(demo, label)._id, "select")
+    opened = select.outputs[0]
+    render = _listener(demo, opened._id, "change")
+    assert render.renderable is not None
+
+    # State inputs are read from the session, so the value passed is ignored
+    before = asyncio.run(demo.process_api(render, [None], state))
+
+    selected = asyncio.run(demo.process_api(select, [], state))
+    assert state[opened._id] is True
+    # The browser fires State.change for the ids reported here
+    assert selected["changed_state_ids"] == [opened._id]
+
+    after = asyncio.run(demo.process_api(render, [None], state))
+    assert len(after["render_config"]["components"]) > len(
+        before["render_config"]["components"]
+    )
@@ -0,0 +1,231 @@
+"""
+Upgrade of databases written by the original (schema version 0) release.
+"""
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import core.database as database
+from core.database import db, init_database, close_pool, from_epoch_us, _unpack
+from core.models import SystemEvent
+
+# Schema and encoding of the original release: TIMESTAMP columns holding the
+# sqlite3 adapter's ISO text, TEXT columns holding json.dumps() output.
+BASELINE_SCHEMA = """
+    CREATE TABLE agent_sessions (
+        id TEXT PRIMARY KEY,
+        agent_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP,
+        configuration TEXT,
+        metadata TEXT
+    );
+    CREATE TABLE conversations (
+        id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP,
+        context TEXT,
+        token_usage TEXT
+    );
+    CREATE TABLE messages (
+        id TEXT PRIMARY KEY,
+        conversation_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        metadata TEXT,
+        tool_calls TEXT
+    );
+    CREATE TABLE performance_metrics (
+        id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        conversation_id TEXT,
+        response_time_ms REAL NOT NULL,
+        token_count_input INTEGER DEFAULT 0,
+        token_count_output INTEGER DEFAULT 0,
+        success_rate REAL DEFAULT 1.0,
+        error_count INTEGER DEFAULT 0,
+        timestamp TIMESTAMP NOT NULL,
+        resource_usage TEXT,
+        quality_score REAL
+    );
+    CREATE TABLE system_events (
+        id TEXT PRIMARY KEY,
+        event_type TEXT NOT NULL,
+        session_id TEXT,
+        conversation_id TEXT,
+        message TEXT NOT NULL,
+        details TEXT,
+        timestamp TIMESTAMP NOT NULL,
+        stack_trace TEXT
+    );
+    CREATE TABLE agent_configurations (
+        id TEXT PRIMARY KEY,
+        agent_name TEXT NOT NULL,
+        model_parameters TEXT,
+        system_prompt TEXT,
+        tools TEXT,
+        environment_variables TEXT,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE
+    );
+    CREATE INDEX idx_messages_conversation ON messages(conversation_id);
+    CREATE INDEX idx_events_session ON system_events(session_id);
+    CREATE INDEX idx_events_type ON system_events(event_type);
+"""
+
+SESSION_START = datetime(2024, 1, 15, 9, 30, 0, 123456)
+SESSION_END = datetime(2024, 2, 3, 17, 5, 42)
+JANUARY = datetime(2024, 1, 20, 8, 0, 0, 500000)
+FEBRUARY = datetime(2024, 2, 1, 23, 59, 59, 999999)
+CONFIGURATION = {"model": "gpt-4", "temperature": 0.7}
+METADATA = {"environment": "production"}
+DETAILS = {"api_endpoint": "https://api.example.com", "timeout_ms": 5000}
+
+
+def _ts(dt: datetime) -> str:
+    # What the sqlite3 default datetime adapter stored
+    return dt.isoformat(" ")
+
+
+@pytest.fixture
+def baseline_db(tmp_path, monkeypatch):
+    path = tmp_path / "observability.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute(
+        "INSERT INTO agent_sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("s1", "Healthcare Assistant", "idle", _ts(SESSION_START), _ts(SESSION_END),
+         json.dumps(CONFIGURATION), json.dumps(METADATA))
+    )
+    conn.execute(
+        "INSERT INTO agent_sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("s2", "Data Processor", "active", _ts(FEBRUARY), None, json.dumps({}), json.dumps({}))
+    )
+    conn.execute(
+        "INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?)",
+        ("c1", "s1", _ts(JANUARY), None, json.dumps({"topic": "consultation"}),
+         json.dumps({"input": 150, "output": 200}))
+    )
+    conn.executemany(
+        "INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("m1", "c1", "user", "January question", _ts(JANUARY),
+             json.dumps({"source": "web"}), json.dumps([])),
+            ("m2", "c1", "assistant", "February answer", _ts(FEBRUARY),
+             json.dumps({"confidence": 0.95}), json.dumps([])),
+        ]
+    )
+    conn.execute(
+        "INSERT INTO performance_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ("p1", "s1", "c1", 1250.5, 150, 200, 1.0, 0, _ts(JANUARY),
+         json.dumps({"cpu_usage": 15.2}), 0.92)
+    )
+    conn.executemany(
+        "INSERT INTO system_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("e1", "info", "s1", None, "Session started", json.dumps({}), _ts(JANUARY), None),
+            ("e2", "error", "s1", "c1", "Connection timeout", json.dumps(DETAILS),
+             _ts(FEBRUARY), "TimeoutError: Request timed out"),
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    init_database()
+    yield path
+    db.flush()
+    close_pool()
+
+
+def test_row_counts_survive_upgrade(baseline_db):
+    conn = sqlite3.connect(baseline_db)
+    try:
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("agent_sessions", "conversations", "messages",
+                          "performance_metrics", "system_events")
+        }
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    assert counts == {
+        "agent_sessions": 2,
+        "conversations": 1,
+        "messages": 2,
+        "performance_metrics": 1,
+        "system_events": 2,
+    }
+    assert version == database.SCHEMA_VERSION
+
+
+def test_messages_and_events_are_split_into_monthly_shards(baseline_db):
+    conn = sqlite3.connect(baseline_db)
+    try:
+        objects = dict(conn.execute(
+            "SELECT name, type FROM sqlite_master WHERE name LIKE 'messages%' "
+            "OR name LIKE 'system_events%'"
+        ).fetchall())
+        january = conn.execute("SELECT id FROM messages_202401").fetchall()
+        february = conn.execute("SELECT id FROM system_events_202402").fetchall()
+    finally:
+        conn.close()
+    assert objects["messages"] == "view"
+    assert objects["system_events"] == "view"
+    assert objects["messages_202401"] == objects["messages_202402"] == "table"
+    assert january == [("m1",)]
+    assert february == [("e2",)]
+
+
+def test_timestamps_are_converted_exactly(baseline_db):
+    conn = sqlite3.connect(baseline_db)
+    try:
+        text_timestamps = conn.execute(
+            "SELECT COUNT(*) FROM agent_sessions WHERE typeof(start_time) = 'text' "
+            "OR typeof(end_time) = 'text'"
+        ).fetchone()[0]
+        message_times = dict(conn.execute("SELECT id, timestamp FROM messages").fetchall())
+    finally:
+        conn.close()
+    assert text_timestamps == 0
+    assert {k: from_epoch_us(v) for k, v in message_times.items()} == {
+        "m1": JANUARY, "m2": FEBRUARY
+    }
+
+    session = db.get_session("s1")
+    assert session.start_time == SESSION_START
+    assert session.end_time == SESSION_END
+    assert db.get_session("s2").end_time is None
+
+
+def test_legacy_json_decodes(baseline_db):
+    session = db.get_session("s1")
+    assert session.configuration == CONFIGURATION
+    assert session.metadata == METADATA
+
+    event = db.get_event("e2")
+    assert event.timestamp == FEBRUARY
+    assert event.details == DETAILS
+    assert event.stack_trace == "TimeoutError: Request timed out"
+
+    conn = sqlite3.connect(baseline_db)
+    try:
+        metadata = conn.execute("SELECT metadata FROM messages WHERE id = 'm2'").fetchone()[0]
+    finally:
+        conn.close()
+    assert _unpack(metadata) == {"confidence": 0.95}
+
+
+def test_upgraded_database_accepts_new_rows(baseline_db):
+    db.add_event(SystemEvent(
+        id="e3", event_type="warning", message="After upgrade",
+        timestamp=datetime(2024, 2, 2)
+    ))
+    db.flush()
+    assert [e.id for e in db.get_recent_events(10)] == ["e3", "e2", "e1"]
@@ -0,0 +1,72 @@
+"""
+PHI redaction of content logged by the CrewAI integration.
+"""
+import random
+
+import pytest
+
+import integrations.crewai_integration as crewai_integration
+from integrations.crewai_integration import _sanitize_phi
+
+
+@pytest.fixture
+def re_only(monkeypatch):
+    monkeypatch.setattr(crewai_integration, "_PHI_HS", None)
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("SSN 123-45-6789 on file", "SSN [SSN] on file"),
+    ("MRN 1234567890", "MRN [MRN]"),
+    ("Seen on 3/14/2024", "Seen on [DATE]"),
+    ("seen by John Smith today", "seen by [PATIENT_NAME] today"),
+    ("Call 555-123-4567", "Call [PHONE]"),
+    ("Mail jsmith@example.com today", "Mail [EMAIL] today"),
+    ("no identifiers here", "no identifiers here"),
+])
+def test_each_pattern_is_redacted(re_only, content, expected):
+    assert _sanitize_phi(content) == expected
+
+
+def test_earlier_pattern_wins_at_the_same_position(re_only):
+    # An SSN-shaped run is never reported as part of a longer phone number
+    assert _sanitize_phi("123-45-6789") == "[SSN]"
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("Referred by Mary Jones.mjones@example.org for follow-up",
+     "Referred by [PATIENT_NAME][EMAIL] for follow-up"),
+    ("ask for Ann Lee.a.lee@clinic.org or Bob Stone",
+     "ask for [PATIENT_NAME][EMAIL] or [PATIENT_NAME]"),
+])
+def test_phi_adjacent_to_a_match_is_redacted_in_full(re_only, content, expected):
+    assert _sanitize_phi(content) == expected
+
+
+_PHI_SAMPLES = [
+    "Referred by Mary Jones.mjones@example.org for follow-up",
+    "ask for Ann Lee.a.lee@clinic.org or Bob Stone",
+    "John\x1cSmith",
+    "SSN 123-45-6789, phone 555-123-4567, MRN 1234567890 on 3/14/2024",
+    "plain text without identifiers",
+]
+
+
+def _random_inputs(count: int) -> list:
+    rng = random.Random(42)
+    alphabet = "aAbBzZ0123456789-/@.%+_| \t\n\x1c"
+    pieces = _PHI_SAMPLES + ["Mary Jones", "mj@example.org", "123-45-6789"]
+    return [
+        "".join(
+            rng.choice(pieces) if rng.random() < 0.1 else rng.choice(alphabet)
+            for _ in range(rng.randint(0, 40))
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.skipif(crewai_integration._PHI_HS is None, reason="hyperscan is not installed")
+@pytest.mark.parametrize("content", _PHI_SAMPLES + _random_inputs(2000))
+def test_hyperscan_output_matches_re(content):
+    assert _sanitize_phi(content) == crewai_integration._PHI_RE.sub(
+        crewai_integration._replace_phi, content
+    )
@@ -2,12 +2,48 @@
 Analytics interface for historical data analysis.
 """
 import gradio as gr
-import pandas as pd
-import plotly.graph_objects as go
+from functools import lru_cache
 from datetime import datetime, timedelta
 
 from core.database import db
 
+@lru_cache(maxsize=1)
+def _placeholder_results():
+    """Build the placeholder charts and table once; every click returns them."""
+    # plotly and pandas are slow to import; load them on first use
+    import pandas as pd
+    import plotly.graph_objects as go
+    
+    # Empty performance chart
+    perf_fig = go.Figure()
+    perf_fig.add_annotation(
+        text="Analytics feature coming soon",
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="gray")
+    )
+    perf_fig.update_layout(title="Performance Trends", height=400)
+    
+    # Empty token chart
+    token_fig = go.Figure()
+    token_fig.add_annotation(
+        text="Token analytics feature coming soon",
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="gray")
+    )
+    token_fig.update_layout(title="Token Usage", height=400)
+    
+    # Empty conversation table
+    conv_df = pd.DataFrame({
+        'Session ID': [],
+        'Start Time': [],
+        'Messages': [],
+        'Tokens': []
+    })
+    
+    return perf_fig, token_fig, conv_df
+
 def create_analytics():
     """Create the analytics interface."""
     with gr.Column():
@@ -42,36 +78,7 @@ def create_analytics():
             # Placeholder for analytics generation
             # In a real implementation, this would query the database
             # and generate meaningful charts and tables
-            
-            # Empty performance chart
-            perf_fig = go.Figure()
-            perf_fig.add_annotation(
-                text="Analytics feature coming soon",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False,
-                font=dict(size=16, color="gray")
-            )
-            perf_fig.update_layout(title="Performance Trends", height=400)
-            
-            # Empty token chart
-            token_fig = go.Figure()
-            token_fig.add_annotation(
-                text="Token analytics feature coming soon",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False,
-                font=dict(size=16, color="gray")
-            )
-            token_fig.update_layout(title="Token Usage", height=400)
-            
-            # Empty conversation table
-            conv_df = pd.DataFrame({
-                'Session ID': [],
-                'Start Time': [],
-                'Messages': [],
-                'Tokens': []
-            })
-            
-            return perf_fig, token_fig, conv_df
+            return _placeholder_results()
         
         analyze_btn.click(
             fn=generate_analytics,
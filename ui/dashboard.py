@@ -1,40 +1,74 @@
 """
 Live dashboard interface for real-time agent monitoring.
 """
+import sqlite3
+import threading
+import time
 import gradio as gr
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from core.database import db
 from core.models import AgentStatus
 
+# plotly and pandas are slow to import, so the chart and table builders import
+# them on first call rather than when the UI modules load.
+
+# Minimum seconds between dashboard refreshes, shared by every viewer
+REFRESH_MIN_INTERVAL = 0.5
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+
+# (data version, refresh_dashboard() result) from the last full refresh
+_refresh_cache = None
+
+# Recent events table, updated from the events near or after the newest shown.
+# Rows can commit out of timestamp order (queued writes, concurrent producers),
+# so each refresh re-reads an overlap window before that event and merges by id.
+EVENTS_TABLE_SIZE = 10
+EVENTS_OVERLAP_US = 5_000_000
+_events_rows: List[sqlite3.Row] = []
+_events_table = None
+_events_source = None
+_events_lock = threading.Lock()
+
+# One Figure per chart, cleared and refilled on each refresh instead of rebuilt.
+# Callers share the returned object, so the refresh handler runs one at a time.
+_figures: Dict[str, Any] = {}
+_figures_lock = threading.Lock()
+
+def _reset_figure(name: str):
+    """Get the pooled figure for ``name`` with its traces and annotations removed."""
+    import plotly.graph_objects as go
+    
+    fig = _figures.get(name)
+    if fig is None:
+        fig = _figures[name] = go.Figure()
+    fig.data = ()
+    fig.layout.annotations = ()
+    return fig
+
 def get_active_sessions_count() -> int:
     """Get count of active sessions."""
-    sessions = db.get_active_sessions()
-    return len(sessions)
+    return db.count_active_sessions()
 
 def get_session_status_distribution() -> Dict[str, int]:
     """Get distribution of session statuses."""
-    from core.database import get_connection
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT status, COUNT(*) as count 
-            FROM agent_sessions 
-            GROUP BY status
-        """)
-        return {row['status']: row['count'] for row in cursor.fetchall()}
-
-def create_metrics_chart():
+    return db.get_session_status_counts()
+
+def create_metrics_chart(metrics_summary: Optional[Dict[str, Any]] = None):
     """Create performance metrics chart."""
-    metrics_summary = db.get_metrics_summary()
+    if metrics_summary is None:
+        metrics_summary = db.get_metrics_summary()
+    
+    with _figures_lock:
+        return _fill_metrics_chart(_reset_figure("metrics"), metrics_summary)
+
+def _fill_metrics_chart(fig, metrics_summary: Dict[str, Any]):
+    import plotly.graph_objects as go
     
     if not metrics_summary or not metrics_summary.get('total_requests'):
         # Return empty chart if no data
-        fig = go.Figure()
         fig.add_annotation(
             text="No data available",
             xref="paper", yref="paper",
@@ -57,10 +91,10 @@ def create_metrics_chart():
         metrics_summary.get('total_requests', 0) or 0
     ]
     
-    fig = go.Figure(data=[
+    fig.add_trace(
         go.Bar(x=labels, y=values, 
                marker_color=['lightblue', 'lightgreen', 'lightcoral'])
-    ])
+    )
     
     fig.update_layout(
         title="Performance Metrics Overview",
@@ -71,12 +105,18 @@ def create_metrics_chart():
     
     return fig
 
-def create_session_status_chart():
+def create_session_status_chart(status_dist: Optional[Dict[str, int]] = None):
     """Create session status distribution chart."""
-    status_dist = get_session_status_distribution()
+    if status_dist is None:
+        status_dist = get_session_status_distribution()
+    
+    with _figures_lock:
+        return _fill_session_status_chart(_reset_figure("status"), status_dist)
+
+def _fill_session_status_chart(fig, status_dist: Dict[str, int]):
+    import plotly.graph_objects as go
     
     if not status_dist:
-        fig = go.Figure()
         fig.add_annotation(
             text="No sessions found",
             xref="paper", yref="paper",
@@ -86,11 +126,11 @@ def create_session_status_chart():
         fig.update_layout(title="Session Status Distribution", height=400)
         return fig
     
-    fig = go.Figure(data=[
+    fig.add_trace(
         go.Pie(labels=list(status_dist.keys()), 
                values=list(status_dist.values()),
                hole=0.3)
-    ])
+    )
     
     fig.update_layout(
         title="Session Status Distribution",
@@ -99,9 +139,12 @@ def create_session_status_chart():
     
     return fig
 
-def get_recent_events_table():
+def get_recent_events_table(events: Optional[List[sqlite3.Row]] = None):
     """Get recent events for display."""
-    events = db.get_recent_events(limit=10)
+    import pandas as pd
+    
+    if events is None:
+        events = db.get_recent_events_raw(limit=10)
     
     if not events:
         return pd.DataFrame({
@@ -111,25 +154,68 @@ def get_recent_events_table():
             'Session ID': []
         })
     
-    data = []
-    for event in events:
-        data.append({
-            'Timestamp': event.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'Type': event.event_type.upper(),
-            'Message': event.message[:100] + '...' if len(event.message) > 100 else event.message,
-            'Session ID': event.session_id[:8] + '...' if event.session_id else 'N/A'
-        })
+    df = pd.DataFrame.from_records(
+        [(e['timestamp'], e['event_type'], e['message'], e['session_id']) for e in events],
+        columns=['Timestamp', 'Type', 'Message', 'Session ID']
+    )
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], unit='us').dt.strftime('%Y-%m-%d %H:%M:%S')
+    df['Type'] = df['Type'].str.upper()
+    message = df['Message']
+    df['Message'] = message.str.slice(0, 100).where(message.str.len() <= 100,
+                                                    message.str.slice(0, 100) + '...')
+    session_id = df['Session ID']
+    df['Session ID'] = (session_id.str.slice(0, 8) + '...').where(session_id.str.len() > 0, 'N/A')
     
-    return pd.DataFrame(data)
+    return df
+
+def _update_events_table(fetched: List[sqlite3.Row]):
+    """Merge ``fetched`` into the shown events and rebuild the table if they changed."""
+    global _events_rows, _events_table
+    merged = {row['id']: row for row in _events_rows}
+    merged.update((row['id'], row) for row in fetched)
+    rows = sorted(merged.values(), key=lambda row: row['timestamp'], reverse=True)
+    rows = rows[:EVENTS_TABLE_SIZE]
+    if _events_table is None or [r['id'] for r in rows] != [r['id'] for r in _events_rows]:
+        _events_table = get_recent_events_table(rows)
+    _events_rows = rows
+    return _events_table
 
 def refresh_dashboard():
-    """Refresh dashboard data."""
-    active_count = get_active_sessions_count()
-    metrics_chart = create_metrics_chart()
-    status_chart = create_session_status_chart()
-    events_df = get_recent_events_table()
+    """Refresh dashboard data, reusing the last result while nothing has been written."""
+    global _refresh_cache, _events_rows, _events_table, _events_source
+    version = db.get_data_version()
+    cached = _refresh_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    with _events_lock:
+        if _events_source != version[0]:
+            # A different database (pool) than the one the table was built from
+            _events_rows, _events_table, _events_source = [], None, version[0]
+        since = _events_rows[0]['timestamp'] - EVENTS_OVERLAP_US if _events_rows else None
+        snapshot = db.get_dashboard_snapshot(event_limit=EVENTS_TABLE_SIZE, events_since=since)
+        events_df = _update_events_table(snapshot.recent_events)
+    metrics_chart = create_metrics_chart(snapshot.metrics_summary)
+    status_chart = create_session_status_chart(snapshot.status_dist)
     
-    return active_count, metrics_chart, status_chart, events_df
+    result = snapshot.active_count, metrics_chart, status_chart, events_df
+    _refresh_cache = (version, result)
+    return result
+
+def throttled_refresh_dashboard():
+    """
+    Refresh dashboard data at most once per REFRESH_MIN_INTERVAL.
+
+    Requests that arrive sooner, from any viewer, get the last result.
+    """
+    global _last_refresh
+    with _refresh_lock:
+        now = time.monotonic()
+        cached = _refresh_cache
+        if cached is not None and now - _last_refresh < REFRESH_MIN_INTERVAL:
+            return cached[1]
+        _last_refresh = now
+    return refresh_dashboard()
 
 def create_dashboard():
     """Create the main dashboard interface."""
@@ -162,6 +248,7 @@ def create_dashboard():
         
         # Set up refresh functionality
         refresh_btn.click(
-            fn=refresh_dashboard,
-            outputs=[active_sessions_display, metrics_plot, status_plot, events_table]
+            fn=throttled_refresh_dashboard,
+            outputs=[active_sessions_display, metrics_plot, status_plot, events_table],
+            concurrency_limit=1
         )
\ No newline at end of file
@@ -3,10 +3,14 @@ Debug console interface for troubleshooting and testing.
 """
 import gradio as gr
 import json
+import uuid
 from datetime import datetime
 
-from core.database import db
-from core.models import SystemEvent, EventType
+from core.database import db, from_epoch_us
+from core.models import AgentSession, AgentStatus, SystemEvent, EventType
+
+# One line of the log view: timestamp, level, message, session suffix
+_LOG_FMT = "[%s] %s: %s%s"
 
 def create_debug():
     """Create the debug console interface."""
@@ -27,7 +31,8 @@ def create_debug():
                     label="Log Output",
                     lines=15,
                     interactive=False,
-                    max_lines=50
+                    max_lines=50,
+                    placeholder="Click Refresh Logs to load recent events"
                 )
                 
                 with gr.Row():
@@ -60,24 +65,20 @@ def create_debug():
         
         def refresh_logs(level_filter):
             """Refresh the log display."""
-            events = db.get_recent_events(limit=50)
+            events = db.get_recent_events_raw(limit=50, level=level_filter)
             
             if not events:
-                return "No logs available"
+                return "No logs available" if level_filter == "ALL" else f"No {level_filter} logs found"
             
-            log_lines = []
-            for event in events:
-                if level_filter != "ALL" and event.event_type.upper() != level_filter:
-                    continue
-                
-                timestamp = event.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                level = event.event_type.upper()
-                message = event.message
-                session_info = f" [Session: {event.session_id[:8]}...]" if event.session_id else ""
-                
-                log_lines.append(f"[{timestamp}] {level}: {message}{session_info}")
-            
-            return "\n".join(log_lines) if log_lines else f"No {level_filter} logs found"
+            return "\n".join(
+                _LOG_FMT % (
+                    from_epoch_us(event['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
+                    event['event_type'].upper(),
+                    event['message'],
+                    f" [Session: {event['session_id'][:8]}...]" if event['session_id'] else ""
+                )
+                for event in events
+            )
         
         def clear_logs():
             """Clear the log display."""
@@ -108,9 +109,6 @@ def create_debug():
         
         def create_test_session():
             """Create a test session."""
-            from core.models import AgentSession, AgentStatus
-            import uuid
-            
             test_session = AgentSession(
                 id=str(uuid.uuid4()),
                 agent_name="Debug Test Agent",
@@ -129,7 +127,8 @@ def create_debug():
         refresh_logs_btn.click(
             fn=refresh_logs,
             inputs=[log_level_filter],
-            outputs=[log_output]
+            outputs=[log_output],
+            concurrency_limit=16
         )
         
         clear_logs_btn.click(
@@ -157,6 +156,3 @@ def create_debug():
             fn=export_debug_data,
             outputs=[test_result]
         )
-        
-        # Initial log load
-        log_output.value = refresh_logs("ALL")
\ No newline at end of file
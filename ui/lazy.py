@@ -0,0 +1,27 @@
+"""
+Tabs whose contents are built the first time they are opened.
+"""
+from typing import Callable
+
+import gradio as gr
+
+
+def lazy_tab(label: str, build: Callable[[], None]) -> gr.Tab:
+    """
+    Add a tab that calls ``build`` on its first selection in each browser session.
+
+    Use it for tabs other than the one shown on page load, so their components
+    and any reads they make at construction time cost nothing until needed.
+    """
+    with gr.Tab(label) as tab:
+        opened = gr.State(False)
+
+        # State.change only fires when the value differs, so later selections
+        # keep the rendered contents instead of rebuilding them
+        @gr.render(inputs=opened, triggers=[opened.change])
+        def render_contents(is_open):
+            if is_open:
+                build()
+
+    tab.select(fn=lambda: True, outputs=opened, queue=False)
+    return tab